@@ -0,0 +1,21 @@
+"""Grid-size-agnostic slot machine engine shared by the 7x7 and 8x8 variant scripts.
+
+A variant script loads a Machine (grid, symbols, paytable, wild, short-line rules, paylines, bonus rule) from a JSON/TOML
+definition in machines/ and hands it, with a theme, to slot_engine.cli.main. The GUI and CLI live in slot_engine.gui and slot_engine.cli so the engine itself does not
+need a display. NumPy, colorama and tkinter are imported on first use, so importing the engine stays cheap.
+"""
+from .machine import Machine, generate_paylines, FREE_SPINS, JACKPOT_BASE, JACKPOT_INCREMENT
+from .definition import load_machine, validate_definition, build_machine, save_machine
+from .randomness import SecretsRandom, BufferedCryptoRandom, SeededRandom, ReplayRandom, set_random_source
+from .storage import (SAVE_FILE, LEADERBOARD_DB, LEADERBOARD_SIZE, JACKPOT_POOL_DB, SESSION_DB, LeaderboardStore, JackpotPool, SessionStore,
+                      SaveWorker, write_json_atomic, load_game, save_game, reset_game, load_leaderboard,
+                      save_leaderboard, benchmark_jackpot_pool)
+from .journal import SpinJournal, JournalReader, journal_file, get_journal_report
+from .simulation import benchmark_rng, play_session, simulate_spins, run_simulation, get_simulation_report
+from .rtp import line_win_probabilities, payline_overlaps, payline_overlap_stats, compute_exact_rtp, get_exact_rtp_report
+from .bonus import (bonus_trigger_probability, expected_spin, simulate_free_spin_rounds, simulate_trigger_spins,
+                    sample_line_wins, analyze_bonus, get_bonus_report)
+from .state import STATE_VERSION, GameState
+from .stats import HISTOGRAM_BUCKETS, QuantileSketch, EventInterval, SpinStats, get_spin_stats_report
+from .profiling import PROFILE_FILE, PHASES, SpinProfiler
+from .autoplay import AUTOPLAY_RULES, autoplay_stop_reason, run_autoplay, get_autoplay_report
@@ -0,0 +1,74 @@
+import time
+
+from .randomness import SeededRandom, set_random_source
+
+# Stop conditions for autoplay; None/False disables a condition
+AUTOPLAY_RULES = {
+    "stop_below": None,  # Stop once the balance drops below this many coins
+    "stop_win_above": None,  # Stop after a spin (including its free spins) wins more than this many coins
+    "stop_on_bonus": False,
+    "stop_on_jackpot": False,
+}
+
+def autoplay_stop_reason(rules, balance, bet, won=0, bonus=False, jackpot_payout=0):
+    """Return why autoplay should stop after a spin, or None to keep going."""
+    if rules.get("stop_on_jackpot") and jackpot_payout:
+        return f"Jackpot won ({jackpot_payout} coins)"
+    if rules.get("stop_on_bonus") and bonus:
+        return "Bonus triggered"
+    if rules.get("stop_win_above") is not None and won > rules["stop_win_above"]:
+        return f"Won {won} coins"
+    if rules.get("stop_below") is not None and balance < rules["stop_below"]:
+        return f"Balance below {rules['stop_below']} coins"
+    if balance < max(bet, 1):  # spin() refuses a bet above the balance, even when an extra spin would pay for it
+        return "Balance too low for the bet"
+    return None
+
+def run_autoplay(machine, spins, bet=1, rules=None, balance=100, seed=None):
+    """Headless autoplay: play up to `spins` paid spins with the GUI's rules until a stop condition hits; return a summary."""
+    rules = dict(AUTOPLAY_RULES, **(rules or {}))
+    previous = set_random_source(SeededRandom(seed)) if seed is not None else None
+    jackpot, credits = machine.jackpot_base, 0
+    played = bonuses = jackpots = total_won = 0
+    reason = autoplay_stop_reason(rules, balance, bet)
+    start = time.perf_counter()
+    try:
+        while played < spins and reason is None:
+            played += 1
+            balance -= bet
+            jackpot += bet * machine.jackpot_increment
+            reels = machine.spin_reels()
+            payout, _, extra_credits = machine.check_paylines(reels, bet)
+            jackpot_payout = machine.check_jackpot(bet, jackpot)
+            balance += payout + jackpot_payout
+            credits += extra_credits
+            won = payout + jackpot_payout
+            if jackpot_payout:
+                jackpots += 1
+                jackpot = machine.jackpot_base
+            bonus = machine.check_bonus(reels)
+            if bonus:
+                bonuses += 1
+                for _ in range(machine.free_spins):
+                    free_payout, _, free_credits = machine.check_paylines(machine.spin_reels(), bet)
+                    balance += free_payout + free_credits  # free_spins_mode pays credits into the balance too
+                    credits += free_credits
+                    won += free_payout + free_credits
+            total_won += won
+            reason = autoplay_stop_reason(rules, balance, bet, won, bonus, jackpot_payout)
+    finally:
+        if previous is not None:
+            set_random_source(previous)
+    elapsed = time.perf_counter() - start
+    return {"spins": played, "reason": reason or f"Finished {spins} spins", "balance": balance, "credits": credits,
+            "jackpot": jackpot, "total_won": total_won, "bonuses": bonuses, "jackpots": jackpots,
+            "elapsed": elapsed, "spins_per_second": played / elapsed if elapsed else 0.0}
+
+def get_autoplay_report(summary):
+    """Return a formatted autoplay summary."""
+    return (f"Autoplay stopped: {summary['reason']}\n"
+            f"Spins: {summary['spins']} ({summary['spins_per_second']:,.0f} spins/s)\n"
+            f"Balance: {summary['balance']} coins\n"
+            f"Credits: {summary['credits']}\n"
+            f"Jackpot: {summary['jackpot']} coins\n"
+            f"Bonuses: {summary['bonuses']}, jackpots: {summary['jackpots']}")
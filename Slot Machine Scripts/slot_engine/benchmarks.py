@@ -0,0 +1,248 @@
+"""Benchmark suite for the engine and GUI hot paths of every variant script.
+
+Run from the "Slot Machine Scripts" directory:
+
+    python -m slot_engine.benchmarks                  # compare against the baseline (saved on the first run)
+    python -m slot_engine.benchmarks --save-baseline  # accept the current numbers as the new baseline
+    xvfb-run python -m slot_engine.benchmarks         # include the Tk spin and window startup benchmarks
+
+Each benchmark is calibrated so one round takes at least --min-time seconds, then timed for --rounds rounds. The fastest
+round's time per call (--stat min, the least noisy on a shared machine) or the median is compared with the baseline, and
+the run exits with status 1 if any benchmark is slower by more than --threshold. The startup/ benchmarks time a fresh
+interpreter per call, so they track cold-start cost: importing the engine or the CLI, and opening each variant's window.
+"""
+import argparse
+import contextlib
+import glob
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import storage
+from .randomness import SeededRandom, set_random_source
+from .state import GameState
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = "benchmark_baseline.json"  # In the current directory, like the other per-machine files, not the source tree
+REGRESSION_THRESHOLD = 0.25  # Fail when a benchmark is more than 25% slower than its baseline
+
+def load_variants(directory=SCRIPTS_DIR):
+    """Import every variant script in `directory` and return {label: (machine, theme, path)}, e.g. {"8x8": ...}."""
+    variants = {}
+    for number, path in enumerate(sorted(glob.glob(os.path.join(directory, "*.py")))):
+        spec = importlib.util.spec_from_file_location(f"_slot_variant_{number}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)  # Scripts only start the game under __main__
+        if hasattr(module, "MACHINE") and hasattr(module, "THEME"):
+            variants[f"{module.MACHINE.rows}x{module.MACHINE.reels}"] = (module.MACHINE, module.THEME, path)
+    return variants
+
+def measure(function, rounds=15, min_time=0.02):
+    """Time `function()` pytest-benchmark style: calibrate the calls per round, then return per-call stats in microseconds."""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1 << 20:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed * 1.2) + 1))
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        times.append((time.perf_counter() - start) / iterations * 1e6)
+    return {"median_us": statistics.median(times), "min_us": min(times), "mean_us": statistics.fmean(times),
+            "stddev_us": statistics.stdev(times) if len(times) > 1 else 0.0, "rounds": rounds, "iterations": iterations}
+
+def _cycle(items):
+    """Return a function handing out `items` in turn, so a benchmark does not time the same input over and over."""
+    state = {"i": 0}
+    def next_item():
+        state["i"] = (state["i"] + 1) % len(items)
+        return items[state["i"]]
+    return next_item
+
+def engine_benchmarks(machine):
+    """Return {name: function} for the evaluator: RNG, paylines on random/all-wild/every-line-wins grids, win highlighting, bonus check."""
+    grids = _cycle([machine.spin_reels() for _ in range(256)])
+    all_wild = [[machine.wild_symbol] * machine.reels for _ in range(machine.rows)]
+    # Worst case for the evaluator: one paying symbol everywhere, so every payline wins and draws credits
+    top_symbol = max((symbol for symbol in machine.symbols if symbol != machine.wild_symbol), key=lambda symbol: machine.payouts[symbol])
+    many_wins = [[top_symbol] * machine.reels for _ in range(machine.rows)]
+    _, all_lines, _ = machine.check_paylines(many_wins, 1)
+    return {
+        "spin_reels": machine.spin_reels,
+        "check_paylines[random]": lambda: machine.check_paylines(grids(), 1),
+        "check_paylines[all_wild]": lambda: machine.check_paylines(all_wild, 1),
+        "check_paylines[many_wins]": lambda: machine.check_paylines(many_wins, 1),
+        "win_cells[many_wins]": lambda: machine.win_cells(all_lines),
+        "check_bonus": lambda: machine.check_bonus(grids()),
+    }
+
+def storage_benchmarks(machine):
+    """Return {name: function} for save_game/load_game, GameState snapshots and save_leaderboard; call them inside a scratch directory."""
+    state = GameState(machine, credits=50)
+    for _ in range(2000):  # A realistic saved stats payload, not empty stats
+        reels = machine.spin_reels()
+        payout, win_lines, credits = machine.check_paylines(reels, 1)
+        state.stats.record(1, payout, credits, win_lines, machine.check_bonus(reels))
+    snapshot = state.to_bytes()
+    scores = _cycle(list(range(1000)))
+    return {
+        "save_game": lambda: storage.save_game(state),
+        "load_game": lambda: storage.load_game(machine),
+        "state_to_bytes": state.to_bytes,
+        "state_from_bytes": lambda: GameState.from_bytes(machine, snapshot),
+        "state_to_dict": state.to_dict,
+        "save_leaderboard": lambda: storage.save_leaderboard(scores(), "Benchmark"),
+    }
+
+def _run_python(*args):
+    """Run a fresh interpreter in the current directory with the engine importable, discarding its output."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (SCRIPTS_DIR, os.environ.get("PYTHONPATH")))))
+    subprocess.run([sys.executable, *args], env=env, check=True, stdout=subprocess.DEVNULL)
+
+def startup_benchmarks():
+    """Return {name: function} timing cold starts: a bare interpreter for reference, then importing the engine and the CLI."""
+    return {
+        "startup/python": lambda: _run_python("-c", "pass"),
+        "startup/import_engine": lambda: _run_python("-c", "import slot_engine"),
+        "startup/import_cli": lambda: _run_python("-c", "import slot_engine.cli"),
+    }
+
+def window_startup_benchmark(path):
+    """Return a function starting the variant script at `path` until its window is fully built (--startup-benchmark)."""
+    return lambda: _run_python(path, "--startup-benchmark")
+
+@contextlib.contextmanager
+def scratch_storage():
+    """Run in a temporary directory with a private leaderboard so benchmarks never touch real saves."""
+    previous_dir, previous_board = os.getcwd(), storage.leaderboard
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        storage.leaderboard = storage.LeaderboardStore(os.path.join(directory, storage.LEADERBOARD_DB))
+        try:
+            yield directory
+        finally:
+            storage.leaderboard.close()
+            storage.leaderboard = previous_board
+            os.chdir(previous_dir)
+
+def gui_benchmark(machine, theme):
+    """Return a function playing one full spin (10 animation frames + finalize_spin) through a real Tk window, or None without a display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:  # No tkinter or no display: run under xvfb-run to include this benchmark
+        return None, None
+    from .gui import SlotMachineGUI
+    app = SlotMachineGUI(root, machine, theme, player_name="Benchmark", interactive=False)
+    app.turbo.set(True)  # Triggered bonuses play without their pauses
+    if app.journal:
+        app.journal.close()
+        app.journal = None  # Journal I/O is not what this benchmark measures
+
+    def spin():
+        app.state.balance, app.state.bet, app.state.extra_spins, app.spinning = 10 ** 6, 1, 0, True
+        app.animate_spin(10, 0)  # The real frame path, minus the 100 ms pauses between frames
+        while app.spinning:
+            root.update()
+        while app.free_spins_left:  # Let a triggered bonus finish so every call starts from the same state
+            root.update()
+        root.update()  # Flush the repaint
+    def close():
+        app.saver.close()
+        root.destroy()
+    return spin, close
+
+def run_benchmarks(variants, rounds=15, min_time=0.02, only=None, include_gui=True, report=print):
+    """Run every benchmark for every variant with a fixed seed and return {"<variant>/<name>": stats}."""
+    results = {}
+    previous = set_random_source(SeededRandom(12345))
+    try:
+        with scratch_storage():
+            def run(key, function):
+                if only and only not in key:
+                    return
+                results[key] = measure(function, rounds, min_time)
+                report(f"{key:<42}{results[key]['median_us']:>12.2f} us  (min {results[key]['min_us']:.2f}, "
+                       f"stddev {results[key]['stddev_us']:.2f}, {results[key]['iterations']} x {rounds})")
+
+            for key, function in startup_benchmarks().items():
+                run(key, function)
+            for label, (machine, theme, path) in variants.items():
+                benchmarks = dict(engine_benchmarks(machine), **storage_benchmarks(machine))
+                close = None
+                if include_gui and (not only or only in f"{label}/animate_spin+finalize_spin" or only in f"{label}/startup/window"):
+                    spin, close = gui_benchmark(machine, theme)
+                    if spin is None:
+                        report(f"{label}/animate_spin+finalize_spin, {label}/startup/window: skipped (no display; run under xvfb-run)")
+                    else:
+                        benchmarks["animate_spin+finalize_spin"] = spin
+                        benchmarks["startup/window"] = window_startup_benchmark(path)
+                try:
+                    for name, function in benchmarks.items():
+                        run(f"{label}/{name}", function)
+                finally:
+                    if close:
+                        close()
+    finally:
+        set_random_source(previous)
+    return results
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, stat="min"):
+    """Return [(key, baseline_us, current_us, change)] for every benchmark whose `stat` regressed beyond `threshold`."""
+    field = f"{stat}_us"
+    regressions = []
+    for key, current in results.items():
+        old = baseline.get(key)
+        if old and current[field] > old[field] * (1 + threshold):
+            regressions.append((key, old[field], current[field], current[field] / old[field] - 1))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the slot engine and GUI for every variant script")
+    parser.add_argument("--rounds", type=int, default=15, help="timed rounds per benchmark (default: 15)")
+    parser.add_argument("--min-time", type=float, default=0.02, help="minimum seconds per round; sets calls per round (default: 0.02)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help=f"allowed slowdown before failing, as a fraction (default: {REGRESSION_THRESHOLD})")
+    parser.add_argument("--stat", choices=("min", "median"), default="min", help="per-call time compared with the baseline (default: min)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help=f"baseline results file (default: {BASELINE_FILE} in the current directory)")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline instead of comparing")
+    parser.add_argument("--results", metavar="PATH", help="also write this run's results to PATH")
+    parser.add_argument("--filter", metavar="TEXT", help="only run benchmarks whose name contains TEXT (e.g. 8x8/check_paylines)")
+    parser.add_argument("--no-gui", action="store_true", help="skip the Tk benchmark even when a display is available")
+    args = parser.parse_args(argv)
+    baseline_path = os.path.abspath(args.baseline)  # The run changes directory
+    results = run_benchmarks(load_variants(), args.rounds, args.min_time, args.filter, not args.no_gui)
+    document = {"created": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+                "results": results}
+    if args.results:
+        storage.write_json_atomic(args.results, document)
+    if args.save_baseline or not os.path.exists(baseline_path):
+        if os.path.exists(baseline_path):  # Keep benchmarks this run skipped (filtered out, or no display)
+            with open(baseline_path, "r") as f:
+                document["results"] = dict(json.load(f).get("results", {}), **results)
+        storage.write_json_atomic(baseline_path, document)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline.get("results", {}), args.threshold, args.stat)
+    for key, old, new, change in regressions:
+        print(f"REGRESSION {key}: {old:.2f} us -> {new:.2f} us (+{change * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold * 100:.0f}% against {baseline_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import math
+import time
+
+from .machine import _require_numpy
+from .rtp import line_win_probabilities
+from .stats import QuantileSketch
+
+# Bonus analysis: the trigger is too rare to observe by brute force (1 in 8**8 on the 8x8), so its probability is
+# computed exactly and the free-spins round is simulated on its own, in NumPy batches, with variance-reduced estimators
+CREDIT_MEAN = 25.5  # Extra credits per winning line: randbelow(50) + 1 averages 25.5
+BONUS_CHUNK = 20000  # Grids per batch
+Z_95 = 1.96
+
+def _interval(total, squares, n):
+    """Return (mean, 95% half-width) from the sum and sum of squares of n samples."""
+    mean = total / n
+    variance = max(squares / n - mean * mean, 0.0) * n / (n - 1) if n > 1 else 0.0
+    return mean, Z_95 * math.sqrt(variance / n)
+
+def bonus_trigger_probability(machine):
+    """Exact probability that a paid spin triggers free spins: every bonus-row cell shows the bonus symbol."""
+    return (1 / machine.symbol_count) ** len(machine.bonus_trigger)
+
+def expected_spin(machine, bet=1):
+    """Exact expected line payout and number of winning lines of one spin."""
+    payout = lines = 0.0
+    for _, positions, multipliers in machine.compiled_paylines:
+        probabilities = line_win_probabilities(machine, len(positions))
+        payout += sum(p * math.floor(bet * multiplier) for p, multiplier in zip(probabilities, multipliers))
+        lines += sum(probabilities)
+    return payout, lines
+
+def simulate_free_spin_rounds(machine, rounds, bet=1, rng=None, chunk=BONUS_CHUNK):
+    """Estimate the coin value of one free-spins round by playing only free-spin grids, in batches.
+
+    A round pays its line payouts plus its extra credits (free_spins_mode pays both into the balance). The credits are
+    replaced by their mean per winning line, and the winning-line count, whose mean is known exactly, is used as a
+    control variate.
+    """
+    np = _require_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    spins = machine.free_spins
+    lines_mean = spins * expected_spin(machine, bet)[1]
+    x = xx = c = cc = xc = 0.0
+    zero_rounds, largest = 0, 0.0
+    sketch = QuantileSketch()
+    done = 0
+    while done < rounds:
+        n = min(max(1, chunk // spins), rounds - done)
+        payouts, win_masks, _ = machine.check_paylines_batch(machine.spin_reels_batch(n * spins, rng), bet, rng=rng)
+        lines = win_masks.sum(axis=1).reshape(n, spins).sum(axis=1).astype(np.float64)
+        values = payouts.reshape(n, spins).sum(axis=1) + CREDIT_MEAN * lines
+        x += float(values.sum())
+        xx += float((values * values).sum())
+        c += float(lines.sum())
+        cc += float((lines * lines).sum())
+        xc += float((values * lines).sum())
+        zero_rounds += int((values == 0).sum())
+        largest = max(largest, float(values.max()))
+        sketch.add_many(values)
+        done += n
+    plain_mean, plain_margin = _interval(x, xx, rounds)
+    line_mean = c / rounds
+    var_x = max(xx / rounds - plain_mean * plain_mean, 0.0)
+    var_c = max(cc / rounds - line_mean * line_mean, 0.0)
+    cov = xc / rounds - plain_mean * line_mean
+    beta = cov / var_c if var_c else 0.0
+    residual = max(var_x - beta * cov, 0.0) * rounds / (rounds - 1) if rounds > 1 else 0.0
+    return {
+        "rounds": rounds,
+        "free_spins": spins,
+        "mean": plain_mean - beta * (line_mean - lines_mean),
+        "margin": Z_95 * math.sqrt(residual / rounds),
+        "plain_mean": plain_mean,
+        "plain_margin": plain_margin,
+        "variance_reduction": var_x / residual * rounds / (rounds - 1) if residual else float("inf"),
+        "zero_probability": zero_rounds / rounds,
+        "p50": sketch.quantile(0.5),
+        "p90": sketch.quantile(0.9),
+        "p99": sketch.quantile(0.99),
+        "max": largest,
+    }
+
+def simulate_trigger_spins(machine, samples, bet=1, rng=None, chunk=BONUS_CHUNK):
+    """Estimate the line payout of the spin that triggers the bonus, sampling only triggering grids.
+
+    The bonus row is fixed to the trigger and every other cell is drawn as usual. That is exactly the distribution of a
+    paid spin given the trigger, so every sample carries the same importance weight, the trigger probability.
+    """
+    np = _require_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    trigger = np.array([machine.symbol_index[symbol] for symbol in machine.bonus_trigger], dtype=np.uint8)
+    x = xx = lines = 0.0
+    done = 0
+    while done < samples:
+        n = min(chunk, samples - done)
+        grids = machine.spin_reels_batch(n, rng)
+        grids[:, machine.bonus_row, :] = trigger
+        payouts, win_masks, _ = machine.check_paylines_batch(grids, bet, rng=rng)
+        x += float(payouts.sum())
+        xx += float((payouts.astype(np.float64) ** 2).sum())
+        lines += float(win_masks.sum())
+        done += n
+    mean, margin = _interval(x, xx, samples)
+    return {"samples": samples, "mean": mean, "margin": margin, "credits": CREDIT_MEAN * lines / samples,
+            "unconditional_mean": expected_spin(machine, bet)[0]}
+
+def sample_line_wins(machine, samples, bet=1, symbols=None, full_lines=True, rng=None, chunk=BONUS_CHUNK):
+    """Importance-sample paid spins on which a payline wins with one of `symbols` (default: the wild and the top payer).
+
+    With `full_lines` only lines that cross every reel count. Each sample picks a (line, symbol) win with probability proportional to its exact chance, draws that line's cells
+    conditioned on the win and every other cell as usual. A grid holding K of the chosen wins is weighted P / K, where P
+    is the sum of their chances, so the weights never exceed P and the estimates stay tight however rare the wins are.
+    """
+    np = _require_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    wild = machine.wild_index
+    if symbols is None:
+        top = max((s for s in machine.symbols if s != machine.wild_symbol), key=lambda s: machine.payouts.get(s, 0))
+        symbols = [machine.wild_symbol, top]
+    chosen = sorted({machine.symbol_index[symbol] for symbol in symbols})
+    counted = [not full_lines or len(positions) == machine.reels for _, positions, _ in machine.compiled_paylines]
+    if not any(counted):
+        raise ValueError("The machine has no full-length paylines")
+    events = [(line, s, line_win_probabilities(machine, len(positions))[s])
+              for line, (_, positions, _) in enumerate(machine.compiled_paylines) if counted[line] for s in chosen]
+    counted = np.array(counted)
+    total = sum(p for _, _, p in events)
+    picks = np.array([p for _, _, p in events]) / total
+    w = ww = wx = wxx = 0.0
+    done = 0
+    while done < samples:
+        n = min(chunk, samples - done)
+        cells = machine.spin_reels_batch(n, rng).reshape(n, -1)
+        drawn = rng.choice(len(events), size=n, p=picks)
+        for event in np.unique(drawn).tolist():
+            line, s, _ = events[event]
+            rows = np.flatnonzero(drawn == event)
+            positions = np.array(machine.compiled_paylines[line][1], dtype=np.intp)
+            if s == wild:
+                cells[rows[:, None], positions] = wild
+                continue
+            # Each cell is the symbol or a wild with equal chance; an all-wild draw would win as wilds, so redraw it
+            own = rng.integers(0, 2, size=(len(rows), len(positions)), dtype=np.uint8).astype(bool)
+            redraw = ~own.any(axis=1)
+            while redraw.any():
+                own[redraw] = rng.integers(0, 2, size=(int(redraw.sum()), len(positions)), dtype=np.uint8).astype(bool)
+                redraw = ~own.any(axis=1)
+            cells[rows[:, None], positions] = np.where(own, s, wild)
+        payouts, win_masks, _, line_symbols = machine.check_paylines_batch(cells.reshape(n, machine.rows, machine.reels), bet,
+                                                                          rng=rng, with_symbols=True)
+        wins = (win_masks & counted & np.isin(line_symbols, chosen)).sum(axis=1)
+        weights = total / wins
+        weighted = weights * payouts
+        w += float(weights.sum())
+        ww += float((weights * weights).sum())
+        wx += float(weighted.sum())
+        wxx += float((weighted * weighted).sum())
+        done += n
+    probability, probability_margin = _interval(w, ww, samples)
+    payout, payout_margin = _interval(wx, wxx, samples)
+    plain_variance = probability * (1 - probability)
+    sampled_variance = (probability_margin / Z_95) ** 2 * samples
+    return {
+        "samples": samples,
+        "symbols": [machine.symbols[s] for s in chosen],
+        "full_lines": full_lines,
+        "union_bound": total,
+        "probability": probability,
+        "probability_margin": probability_margin,
+        "payout": payout,
+        "payout_margin": payout_margin,
+        "conditional_payout": payout / probability if probability else 0.0,
+        # Paid spins a plain simulation would need for the same confidence interval on the probability
+        "plain_spins": samples * plain_variance / sampled_variance if sampled_variance else float("inf"),
+    }
+
+def analyze_bonus(machine, samples=100000, bet=1, seed=None, symbols=None, full_lines=True):
+    """Run the whole bonus analysis: exact trigger odds, the trigger spin, the free-spins round and rare line wins."""
+    np = _require_numpy()
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    probability = bonus_trigger_probability(machine)
+    payout, lines = expected_spin(machine, bet)
+    rounds = simulate_free_spin_rounds(machine, samples, bet, rng)
+    trigger = simulate_trigger_spins(machine, samples, bet, rng)
+    line_wins = sample_line_wins(machine, samples, bet, symbols, full_lines, rng)
+    return {
+        "bet": bet,
+        "trigger_probability": probability,
+        "trigger_odds": machine.symbol_count ** len(machine.bonus_trigger),
+        "exact_round": machine.free_spins * (payout + CREDIT_MEAN * lines),
+        "rounds": rounds,
+        "trigger": trigger,
+        "line_wins": line_wins,
+        "bonus_rtp": probability * rounds["mean"] / bet,
+        "bonus_rtp_margin": probability * rounds["margin"] / bet,
+        "elapsed": time.perf_counter() - start,
+    }
+
+def get_bonus_report(machine, results):
+    """Return formatted bonus analysis results with 95% confidence intervals."""
+    bet, rounds, trigger, line_wins = results["bet"], results["rounds"], results["trigger"], results["line_wins"]
+    return (f"Variant: {machine.rows}x{machine.reels} ({len(machine.paylines)} paylines), bet {bet}\n"
+            f"Bonus trigger: {results['trigger_probability']:.4e} per paid spin (exactly 1 in {results['trigger_odds']:,})\n"
+            f"Free-spins round ({rounds['free_spins']} spins, {rounds['rounds']:,} rounds simulated):\n"
+            f"  Value: {rounds['mean']:.4f} ± {rounds['margin']:.4f} coins (exact {results['exact_round']:.4f}; "
+            f"plain mean {rounds['plain_mean']:.4f} ± {rounds['plain_margin']:.4f}, "
+            f"control variate cuts the variance {rounds['variance_reduction']:.1f}x)\n"
+            f"  Pays nothing: {rounds['zero_probability'] * 100:.2f}%; p50/p90/p99 {rounds['p50']:.0f}/{rounds['p90']:.0f}/"
+            f"{rounds['p99']:.0f}, max {rounds['max']:.0f} coins\n"
+            f"  RTP share: {results['bonus_rtp'] * 100:.4e}% ± {results['bonus_rtp_margin'] * 100:.1e}%\n"
+            f"Triggering spin ({trigger['samples']:,} conditioned samples): lines pay {trigger['mean']:.4f} ± "
+            f"{trigger['margin']:.4f} coins + {trigger['credits']:.2f} credits (any spin: {trigger['unconditional_mean']:.4f})\n"
+            f"Rare {'full-' if line_wins['full_lines'] else ''}line wins ({'/'.join(machine.symbol_names[s] for s in line_wins['symbols'])}, "
+            f"{line_wins['samples']:,} importance samples):\n"
+            f"  Probability: {line_wins['probability']:.4e} ± {line_wins['probability_margin']:.2e} per paid spin "
+            f"(union bound {line_wins['union_bound']:.4e})\n"
+            f"  RTP share: {line_wins['payout'] / bet * 100:.4e}% ± {line_wins['payout_margin'] / bet * 100:.1e}%; "
+            f"such a spin pays {line_wins['conditional_payout']:.2f} coins on average\n"
+            f"  A plain simulation would need ~{line_wins['plain_spins']:,.0f} spins for the same interval\n"
+            f"Elapsed: {results['elapsed']:.2f}s")
@@ -0,0 +1,153 @@
+import argparse
+import contextlib
+import time
+
+from .autoplay import run_autoplay, get_autoplay_report
+from .bonus import analyze_bonus, get_bonus_report
+from .console import Fore, Style, init_console
+from .definition import load_machine, save_machine
+from .journal import journal_file, get_journal_report
+from .profiling import PROFILE_FILE, SpinProfiler
+from .randomness import SeededRandom, set_random_source
+from .rtp import compute_exact_rtp, get_exact_rtp_report
+from .simulation import benchmark_rng, play_session, run_simulation, get_simulation_report
+from .storage import JACKPOT_POOL_DB, LEADERBOARD_SIZE, JackpotPool, benchmark_jackpot_pool
+from . import storage
+
+def parse_grid(text):
+    """Parse a ROWSxREELS grid size such as 10x10."""
+    try:
+        rows, reels = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"grid must look like 10x10, not {text!r}")
+    if not (2 <= rows <= 16 and 2 <= reels <= 16):
+        raise argparse.ArgumentTypeError("grid rows and reels must be between 2 and 16")
+    return rows, reels
+
+def parse_address(text):
+    """Parse a HOST:PORT server address such as 127.0.0.1:8765; a bare PORT listens on localhost."""
+    host, _, port = text.rpartition(":")
+    try:
+        port = int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"address must look like 127.0.0.1:8765, not {text!r}")
+    if not 0 <= port <= 65535:
+        raise argparse.ArgumentTypeError("port must be between 0 and 65535")
+    return host or "127.0.0.1", port
+
+def main(machine, theme, argv=None):
+    """Command-line entry point shared by every variant script: headless tools, or the GUI by default."""
+    started = time.perf_counter()
+    init_console()
+    parser = argparse.ArgumentParser(description=f"{machine.rows}x{machine.reels} slot machine")
+    parser.add_argument("--machine", metavar="PATH", help="load the machine (symbols, paytable, paylines, rules) from a JSON/TOML definition file")
+    parser.add_argument("--export-machine", metavar="PATH", help="write the machine (after --machine/--grid) as a JSON definition to PATH and exit")
+    parser.add_argument("--grid", type=parse_grid, metavar="ROWSxREELS", help="play this variant's symbols and paytable on another grid size with generated paylines (e.g. 10x10)")
+    parser.add_argument("--simulate", type=int, metavar="SPINS", help="play SPINS spins headlessly and report RTP instead of opening the GUI")
+    parser.add_argument("--exact", action="store_true", help="print the exact RTP and per-line contribution table instead of opening the GUI")
+    parser.add_argument("--bonus-analysis", type=int, metavar="SAMPLES", help="print the exact bonus trigger odds and simulated free-spins economics from SAMPLES rounds (requires NumPy)")
+    parser.add_argument("--benchmark-rng", action="store_true", help="compare spins per second with the unbuffered and buffered random sources")
+    parser.add_argument("--bet", type=int, default=1, help="bet per simulated spin (default: 1)")
+    parser.add_argument("--workers", type=int, help="simulation worker processes (default: CPU count)")
+    parser.add_argument("--replay", type=int, metavar="SPINS", help="play SPINS deterministic spins from --seed headlessly and print the ledger digest")
+    parser.add_argument("--ledger", metavar="PATH", help="write the --replay ledger (one CSV row per spin) to PATH for diffing")
+    parser.add_argument("--journal-report", metavar="PATH", nargs="?", const="", help=f"print totals from a spin journal (default: {journal_file(machine)}) instead of opening the GUI")
+    parser.add_argument("--leaderboard-size", type=int, default=LEADERBOARD_SIZE, help=f"number of high scores shown (default: {LEADERBOARD_SIZE})")
+    parser.add_argument("--shared-jackpot", metavar="PATH", nargs="?", const=JACKPOT_POOL_DB, help=f"share a progressive jackpot with every machine using the same pool file (default: {JACKPOT_POOL_DB})")
+    parser.add_argument("--benchmark-jackpot", type=int, metavar="PLAYERS", help="hammer a temporary shared jackpot pool from PLAYERS processes and report throughput")
+    parser.add_argument("--reel-view", choices=("labels", "canvas"), default="labels", help="draw the reels as a grid of Labels or on a single Canvas (default: labels)")
+    parser.add_argument("--autoplay", type=int, metavar="SPINS", help="play up to SPINS spins back-to-back through the GUI, unattended, then quit and print a summary")
+    parser.add_argument("--headless", action="store_true", help="run --autoplay on the engine alone, without a window")
+    parser.add_argument("--stop-below", type=int, metavar="COINS", help="stop autoplay once the balance drops below COINS")
+    parser.add_argument("--stop-win-above", type=int, metavar="COINS", help="stop autoplay after a spin wins more than COINS")
+    parser.add_argument("--stop-on-bonus", action="store_true", help="stop autoplay when free spins are triggered")
+    parser.add_argument("--stop-on-jackpot", action="store_true", help="stop autoplay when the jackpot is won")
+    parser.add_argument("--turbo", action="store_true", help="start the GUI in turbo mode (no reel animation or free spin pauses)")
+    parser.add_argument("--refresh-every", type=int, default=1, metavar="K", help="in turbo autoplay, redraw the reels and labels only every K spins (default: 1)")
+    parser.add_argument("--player", metavar="NAME", help="player name, instead of asking when the GUI opens")
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const=PROFILE_FILE, help=f"time each spin phase (F12 shows the overlay) and write the percentiles to PATH on quit (default: {PROFILE_FILE})")
+    parser.add_argument("--serve", type=parse_address, metavar="HOST:PORT", nargs="?", const=("127.0.0.1", 8765), help="run the multi-player JSON-over-TCP game server instead of the GUI (default: 127.0.0.1:8765)")
+    parser.add_argument("--startup-benchmark", action="store_true", help="open the window, print how long the first paint and the full window took, then close")
+    parser.add_argument("--seed", type=int, help="root seed for --simulate streams, --bonus-analysis, the --replay session, or a deterministic GUI game")
+    args = parser.parse_args(argv)
+    storage.leaderboard.top_k = args.leaderboard_size
+    autoplay_rules = {"stop_below": args.stop_below, "stop_win_above": args.stop_win_above,
+                      "stop_on_bonus": args.stop_on_bonus, "stop_on_jackpot": args.stop_on_jackpot}
+    if args.machine:
+        try:
+            machine = load_machine(args.machine)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load machine definition: {e}")
+        theme = dict(theme, geometry=None, title=f"{machine.name} ({machine.rows}x{machine.reels})")
+    if args.grid and args.grid != (machine.rows, machine.reels):
+        machine = machine.with_grid(*args.grid)
+        theme = dict(theme, geometry=None, title=f"{theme['title'].rsplit(' (', 1)[0]} ({machine.rows}x{machine.reels})")
+    if args.export_machine:
+        save_machine(machine, args.export_machine)
+        print(f"Wrote {machine.rows}x{machine.reels} machine ({len(machine.paylines)} paylines) to {args.export_machine}")
+    elif args.benchmark_rng:
+        for name, rate in benchmark_rng(machine).items():
+            print(f"{name}: {rate:,.0f} spins/s")
+    elif args.exact:
+        print(get_exact_rtp_report(machine, compute_exact_rtp(machine, args.bet)))
+    elif args.bonus_analysis:
+        try:
+            print(get_bonus_report(machine, analyze_bonus(machine, args.bonus_analysis, args.bet, args.seed)))
+        except ImportError as e:
+            parser.error(str(e))
+    elif args.benchmark_jackpot:
+        result = benchmark_jackpot_pool(args.benchmark_jackpot)
+        print(f"Players: {result['players']}\nSpins: {result['spins']} ({result['claims']} claims)\n"
+              f"Throughput: {result['spins_per_second']:,.0f} spins/s\n"
+              f"Latency: p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms\n"
+              f"Pool consistent: {result['consistent']}")
+    elif args.journal_report is not None:
+        print(get_journal_report(machine, args.journal_report or None))
+    elif args.replay:
+        with open(args.ledger, "w") if args.ledger else contextlib.nullcontext() as ledger:
+            summary = play_session(machine, args.replay, args.bet, args.seed or 0, ledger)
+        print(f"Spins: {summary['spins']}\nBalance: {summary['balance']} coins\nCredits: {summary['credits']}\n"
+              f"Jackpot: {summary['jackpot']} coins\nLedger SHA-256: {summary['digest']}")
+    elif args.autoplay and args.headless:
+        print(get_autoplay_report(run_autoplay(machine, args.autoplay, args.bet, autoplay_rules, seed=args.seed)))
+    elif args.serve:
+        from .server import run_server  # asyncio is only needed by the server
+        run_server(machine, theme, *args.serve, JackpotPool(args.shared_jackpot, base=machine.jackpot_base) if args.shared_jackpot else None)
+    elif args.simulate:
+        print(get_simulation_report(machine, run_simulation(machine, args.simulate, args.bet, args.workers, args.seed), args.bet))
+    else:
+        if args.seed is not None:
+            set_random_source(SeededRandom(args.seed))
+        try:
+            import tkinter as tk  # Only the GUI needs Tk, so the headless tools start without it
+            from .gui import SlotMachineGUI
+            root = tk.Tk()
+            pool = JackpotPool(args.shared_jackpot, base=machine.jackpot_base) if args.shared_jackpot else None
+            app = SlotMachineGUI(root, machine, theme, args.reel_view, pool,
+                                 args.player or ("Benchmark" if args.startup_benchmark else None), interactive=not (args.autoplay or args.startup_benchmark),
+                                 profiler=SpinProfiler(args.profile) if args.profile else None)
+            app.turbo.set(args.turbo)
+            if args.startup_benchmark:
+                painted = time.perf_counter()  # The constructor paints the reels and controls before returning
+                root.update()  # Runs finish_startup
+                root.update_idletasks()
+                ready = time.perf_counter()
+                print(f"First paint: {(painted - started) * 1000:.1f} ms\nFull window: {(ready - started) * 1000:.1f} ms")
+                app.saver.close()
+                if app.journal:
+                    app.journal.close()
+                root.destroy()
+                return
+            if args.autoplay:
+                def autoplay_done(summary):
+                    print(get_autoplay_report(summary))
+                    root.after(0, app.quit)
+                app.bet_entry.delete(0, tk.END)
+                app.bet_entry.insert(0, str(args.bet))
+                app.start_autoplay(args.autoplay, autoplay_rules, args.refresh_every, autoplay_done)
+            try:
+                root.mainloop()
+            finally:
+                app.saver.close()  # Flush the last snapshot however the loop ended; a second close is a no-op
+        except Exception as e:
+            print(f"{Fore.RED}Game crashed: {e}. Please check tkinter setup.{Style.RESET_ALL}")
@@ -0,0 +1,24 @@
+class _LazyColorama:
+    """Stand-in for colorama's Fore/Style that imports colorama on first use and prints plain text without it."""
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        try:
+            import colorama
+        except ImportError:
+            return ""
+        value = getattr(getattr(colorama, self._name), attribute)
+        setattr(self, attribute, value)  # Later lookups skip __getattr__
+        return value
+
+Fore = _LazyColorama("Fore")
+Style = _LazyColorama("Style")
+
+def init_console():
+    """Initialize colorama (ANSI colours on Windows consoles) if it is installed."""
+    try:
+        from colorama import init
+    except ImportError:
+        return
+    init()
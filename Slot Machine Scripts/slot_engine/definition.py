@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+
+from .machine import Machine, generate_paylines, FREE_SPINS, JACKPOT_BASE, JACKPOT_INCREMENT
+from .storage import write_json_atomic
+
+# Bump when the compiled form changes so stale cache files are ignored
+COMPILED_FORMAT = 1
+DEFINITION_KEYS = {"name", "rows", "reels", "symbols", "names", "payouts", "wild", "low_symbols", "line_rules",
+                   "paylines", "bonus", "free_spins", "jackpot"}
+RULE_KEYS = {"shorter_than", "symbols", "multiplier", "divide"}
+
+def _read_definition(path, raw):
+    """Parse a definition file's bytes as TOML (.toml) or JSON (anything else)."""
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            raise ValueError(f"{path}: TOML machine definitions need Python 3.11 or newer; use JSON instead.")
+        try:
+            return tomllib.loads(raw.decode("utf-8"))
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"{path}: {e}")
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"{path}: {e}")
+
+def _is_count(value, minimum=0):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+def validate_definition(data, source="definition"):
+    """Check a parsed definition and return it with defaults filled in; raise ValueError naming every problem."""
+    errors = []
+    def fail(message):
+        errors.append(message)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: a machine definition must be an object/table.")
+    for key in sorted(set(data) - DEFINITION_KEYS):
+        fail(f"unknown key {key!r}")
+    for key in ("rows", "reels", "symbols", "payouts", "wild"):
+        if key not in data:
+            fail(f"missing required key {key!r}")
+    if errors:
+        raise ValueError(f"{source}: " + "; ".join(errors))
+
+    rows, reels, symbols = data["rows"], data["reels"], data["symbols"]
+    if not _is_count(rows, 1) or not _is_count(reels, 1) or rows > 255 or reels > 255:
+        fail("rows and reels must be integers from 1 to 255")
+        rows = reels = 0
+    if (not isinstance(symbols, list) or not 2 <= len(symbols) <= 16
+            or not all(isinstance(symbol, str) and symbol for symbol in symbols)):
+        fail("symbols must be a list of 2 to 16 non-empty strings")
+        symbols = []
+    elif len(set(symbols)) != len(symbols):
+        fail("symbols must be unique")
+    known = set(symbols)
+
+    def is_symbol(value):
+        return isinstance(value, str) and value in known
+
+    def check_symbols(value, what):
+        if not isinstance(value, list) or not all(is_symbol(symbol) for symbol in value):
+            fail(f"{what} must be a list of the machine's symbols")
+
+    payouts = data["payouts"]
+    if not isinstance(payouts, dict) or not set(payouts) <= known or not all(_is_count(v) for v in payouts.values()):
+        fail("payouts must map the machine's symbols to non-negative integer multipliers")
+    if not is_symbol(data["wild"]):
+        fail(f"wild symbol {data['wild']!r} is not one of the symbols")
+    names = data.get("names", {})
+    if not isinstance(names, dict) or not set(names) <= known or not all(isinstance(v, str) for v in names.values()):
+        fail("names must map the machine's symbols to display names")
+    check_symbols(data.get("low_symbols", []), "low_symbols")
+
+    line_rules = data.get("line_rules")
+    if line_rules is not None:
+        if not isinstance(line_rules, list):
+            fail("line_rules must be a list of rules")
+            line_rules = []
+        for number, rule in enumerate(line_rules, 1):
+            if not isinstance(rule, dict) or set(rule) - RULE_KEYS:
+                fail(f"line rule {number} may only use the keys {', '.join(sorted(RULE_KEYS))}")
+                continue
+            if ("multiplier" in rule) == ("divide" in rule):
+                fail(f"line rule {number} needs exactly one of 'multiplier' or 'divide'")
+            if "multiplier" in rule and not _is_count(rule["multiplier"]):
+                fail(f"line rule {number}: multiplier must be a non-negative integer")
+            if "divide" in rule and not _is_count(rule["divide"], 1):
+                fail(f"line rule {number}: divide must be a positive integer")
+            if "shorter_than" in rule and not _is_count(rule["shorter_than"], 1):
+                fail(f"line rule {number}: shorter_than must be a positive integer")
+            if "symbols" in rule:
+                check_symbols(rule["symbols"], f"line rule {number} symbols")
+
+    paylines = data.get("paylines", "generated")
+    if paylines != "generated":
+        if not isinstance(paylines, list) or not paylines:
+            fail('paylines must be "generated" or a non-empty list of lines')
+            paylines = []
+        for number, line in enumerate(paylines, 1):
+            cells = [tuple(cell) for cell in line if isinstance(cell, list) and len(cell) == 2] if isinstance(line, list) else []
+            if not cells or len(cells) != len(line):
+                fail(f"payline {number} must be a non-empty list of [row, col] pairs")
+            elif not all(_is_count(row) and _is_count(col) and row < rows and col < reels for row, col in cells):
+                fail(f"payline {number} does not fit a {rows}x{reels} grid")
+            elif len(set(cells)) != len(cells):
+                fail(f"payline {number} uses a cell twice")
+
+    bonus = data.get("bonus", {})
+    if not isinstance(bonus, dict) or set(bonus) - {"symbol", "row"}:
+        fail("bonus may only set 'symbol' and 'row'")
+        bonus = {}
+    if not is_symbol(bonus.get("symbol", data["wild"])):
+        fail("bonus symbol is not one of the symbols")
+    if "row" in bonus and not (_is_count(bonus["row"]) and bonus["row"] < rows):
+        fail(f"bonus row must be between 0 and {rows - 1}")
+    jackpot = data.get("jackpot", {})
+    if not isinstance(jackpot, dict) or set(jackpot) - {"base", "increment"} or not all(_is_count(v) for v in jackpot.values()):
+        fail("jackpot may only set non-negative integer 'base' and 'increment'")
+        jackpot = {}
+    if not _is_count(data.get("free_spins", FREE_SPINS)):
+        fail("free_spins must be a non-negative integer")
+    if errors:
+        raise ValueError(f"{source}: " + "; ".join(errors))
+
+    return {
+        "name": str(data.get("name", "Slot Machine")),
+        "rows": rows,
+        "reels": reels,
+        "symbols": list(symbols),
+        "names": {symbol: names.get(symbol, symbol) for symbol in symbols},
+        "payouts": dict(payouts),
+        "wild": data["wild"],
+        "low_symbols": list(data.get("low_symbols", [])),
+        "line_rules": line_rules,
+        "paylines": (generate_paylines(rows, reels) if paylines == "generated"
+                     else [[tuple(cell) for cell in line] for line in paylines]),
+        "bonus": {"symbol": bonus.get("symbol", data["wild"]), "row": bonus.get("row", rows // 2)},
+        "free_spins": data.get("free_spins", FREE_SPINS),
+        "jackpot": {"base": jackpot.get("base", JACKPOT_BASE), "increment": jackpot.get("increment", JACKPOT_INCREMENT)},
+    }
+
+def build_machine(definition, compiled_paylines=None):
+    """Build a Machine from a validated definition."""
+    return Machine(definition["symbols"], definition["rows"], definition["reels"], definition["payouts"],
+                   definition["wild"], definition["low_symbols"], definition["paylines"], definition["names"],
+                   bonus_symbol=definition["bonus"]["symbol"], bonus_row=definition["bonus"]["row"],
+                   free_spins=definition["free_spins"], jackpot_base=definition["jackpot"]["base"],
+                   jackpot_increment=definition["jackpot"]["increment"], line_rules=definition["line_rules"],
+                   name=definition["name"], compiled_paylines=compiled_paylines)
+
+def compiled_cache_path(path, digest):
+    """Return where the compiled form of a definition file with this hash is cached."""
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "__pycache__", f"{filename}.{digest[:16]}.machine.json")
+
+def _load_compiled(cache_path, digest):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("format") != COMPILED_FORMAT or cached.get("sha256") != digest:
+            return None
+        definition = cached["definition"]
+        definition["paylines"] = [[tuple(cell) for cell in line] for line in definition["paylines"]]
+        compiled = [(mask, tuple(positions), tuple(multipliers)) for mask, positions, multipliers in cached["compiled"]]
+        return build_machine(definition, compiled)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None  # Missing or damaged cache: recompile
+
+def load_machine(path, use_cache=True):
+    """Load a JSON/TOML machine definition, validating and compiling it, or reuse the compiled form cached for its hash."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_path = compiled_cache_path(path, digest)
+    if use_cache:
+        machine = _load_compiled(cache_path, digest)
+        if machine is not None:
+            return machine
+    definition = validate_definition(_read_definition(path, raw), path)
+    machine = build_machine(definition)
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            write_json_atomic(cache_path, {"format": COMPILED_FORMAT, "sha256": digest, "definition": machine.to_definition(),
+                                           "compiled": machine.compiled_paylines})
+        except OSError:
+            pass  # A read-only install still runs, it just compiles on every start
+    return machine
+
+def save_machine(machine, path):
+    """Write a machine as a JSON definition, one payline per line so the file stays easy to edit."""
+    definition = machine.to_definition()
+    paylines = definition.pop("paylines")
+    entries = [f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}" for key, value in definition.items()]
+    lines = ",\n".join("    " + json.dumps(line) for line in paylines)
+    entries.append(f'  "paylines": [\n{lines}\n  ]')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n" + ",\n".join(entries) + "\n}\n")
@@ -0,0 +1,821 @@
+import math
+import time
+import tkinter as tk
+from tkinter import messagebox, simpledialog
+
+from . import randomness
+from .autoplay import AUTOPLAY_RULES, autoplay_stop_reason
+from .console import Fore, Style
+from .journal import SpinJournal
+from .profiling import SpinProfiler
+from .storage import SaveWorker, load_game, reset_game, load_leaderboard, save_leaderboard
+
+AUTOPLAY_DELAY = 300  # ms between autoplay spins, collapsed to 0 in turbo mode
+INSPECT_HINT = "Hover a reel cell to see its paylines"
+
+class ReelRenderer:
+    """Keep the displayed reel grid in Python and push only changed cell attributes to Tk, one batch per frame."""
+    def __init__(self, labels, **attrs):
+        self.labels = labels
+        self.rows, self.cols = len(labels), len(labels[0])
+        self.shown = [[dict(attrs) for _ in range(self.cols)] for _ in range(self.rows)]
+        self.pending = {}
+
+    def set_cell(self, row, col, **attrs):
+        """Stage attributes for one cell; values already on screen are dropped from the batch."""
+        shown = self.shown[row][col]
+        changes = self.pending.get((row, col), {})
+        for attr, value in attrs.items():
+            if shown[attr] != value:
+                changes[attr] = value
+            else:
+                changes.pop(attr, None)
+        if changes:
+            self.pending[(row, col)] = changes
+        else:
+            self.pending.pop((row, col), None)
+
+    def set_grid(self, symbols=None, **attrs):
+        """Stage attributes for every cell, with per-cell text taken from `symbols` when given."""
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if symbols is not None:
+                    self.set_cell(row, col, text=symbols[row][col], **attrs)
+                else:
+                    self.set_cell(row, col, **attrs)
+
+    def text(self, row, col):
+        """Return the symbol the cell will show after the next flush."""
+        return self.pending.get((row, col), {}).get("text", self.shown[row][col]["text"])
+
+    def _apply(self, row, col, changes):
+        self.labels[row][col].config(**changes)
+
+    def flush(self):
+        """Push every staged change to Tk in one pass and return the number of cells touched."""
+        for (row, col), changes in self.pending.items():
+            self._apply(row, col, changes)
+            self.shown[row][col].update(changes)
+        touched = len(self.pending)
+        self.pending = {}
+        return touched
+
+class CanvasReelRenderer(ReelRenderer):
+    """Draw the reel grid on a single Canvas, one background rectangle and one text item per cell."""
+    def __init__(self, root, rows, cols, cell_width=44, cell_height=48, font=("Arial", 14), **attrs):
+        self.labels = None
+        self.rows, self.cols = rows, cols
+        self.shown = [[dict(attrs) for _ in range(cols)] for _ in range(rows)]
+        self.pending = {}
+        self.cell_width, self.cell_height = cell_width, cell_height
+        self.canvas = tk.Canvas(root, width=cols * cell_width, height=rows * cell_height, bg="black", highlightthickness=0)
+        self.cells = []
+        for row in range(rows):
+            cells = []
+            for col in range(cols):
+                x, y = col * cell_width, row * cell_height
+                rect = self.canvas.create_rectangle(x + 1, y + 1, x + cell_width - 1, y + cell_height - 1, fill=attrs["bg"], outline="gray25")
+                text = self.canvas.create_text(x + cell_width // 2, y + cell_height // 2, text=attrs["text"], fill=attrs["fg"], font=font)
+                cells.append((rect, text))
+            self.cells.append(cells)
+
+    def cell_at(self, x, y):
+        """Return the (row, col) under canvas coordinates, or None outside the grid."""
+        row, col = y // self.cell_height, x // self.cell_width
+        return (row, col) if 0 <= row < self.rows and 0 <= col < self.cols else None
+
+    def _apply(self, row, col, changes):
+        rect, text = self.cells[row][col]
+        if "bg" in changes:
+            self.canvas.itemconfigure(rect, fill=changes["bg"])
+        text_changes = {"text": changes["text"]} if "text" in changes else {}
+        if "fg" in changes:
+            text_changes["fill"] = changes["fg"]
+        if text_changes:
+            self.canvas.itemconfigure(text, **text_changes)
+
+class LabelBinder:
+    """Bind labels to the state fields they display; a label is reformatted and pushed to Tk only when its fields change."""
+    def __init__(self, root):
+        self.root = root
+        self.bindings = []  # [label, values, format, values last drawn]
+        self.scheduled = None
+
+    def bind(self, label, values, format):
+        """Show format(*values()) on `label`; `values` returns the tuple of fields the text depends on."""
+        shown = values()
+        label.config(text=format(*shown))
+        self.bindings.append([label, values, format, shown])
+
+    def schedule(self):
+        """Queue a flush for the next idle tick; any number of changes before then cost one pass."""
+        if self.scheduled is None:
+            self.scheduled = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Reconfigure every label whose fields changed since it was last drawn and return the number of labels touched."""
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+            self.scheduled = None
+        touched = 0
+        for binding in self.bindings:
+            values = binding[1]()
+            if values != binding[3]:
+                binding[0].config(text=binding[2](*values))
+                binding[3] = values
+                touched += 1
+        return touched
+
+class SlotMachineGUI:
+    """Tk front-end for any Machine; `theme` holds the variant's title, colours, fonts and store."""
+    def __init__(self, root, machine, theme, reel_view="labels", jackpot_pool=None, player_name=None, interactive=True, profiler=None):
+        self.root = root
+        self.machine = machine
+        self.theme = theme
+        self.store_items = theme["store_items"]
+        self.fg = theme["fg"]
+        self.jackpot_pool = jackpot_pool
+        self.interactive = interactive  # False for unattended autoplay: game over and quit print instead of opening dialogs
+        self.profiler = profiler  # None unless profiling: every hook is a single test of this attribute
+        self.profile_window = None
+        rows, reels = machine.rows, machine.reels
+        font = ("Arial", theme["font_size"], "bold")
+        self.root.title(theme["title"])
+        self.root.configure(bg="black")
+        if theme.get("geometry"):
+            self.root.geometry(theme["geometry"])
+        # The name prompt waits until the window has painted; see finish_startup
+        self.player_name = player_name or "Player"
+        self.ask_player_name = not player_name
+        self.stats_label = None  # Secondary panels (stats, store) are built at idle, after the first paint
+
+        self.state = load_game(machine)  # Balance, jackpot, credits, extra spins, bet, store charm and stats
+        if self.jackpot_pool:
+            self.state.jackpot = self.jackpot_pool.amount()
+        self.saver = SaveWorker(timed=profiler is not None)
+        try:
+            self.journal = SpinJournal(machine)
+        except (IOError, OSError) as e:
+            print(f"{Fore.RED}Failed to open spin journal: {e}. Spins will not be journaled.{Style.RESET_ALL}")
+            self.journal = None
+        self.spinning = False
+        self.free_spins_left = 0
+        self.autoplay = None
+        self.payline_text = "Paylines: None"
+        self.status_text, self.status_fg = "", "blue"
+        self.last_won, self.last_bonus, self.last_jackpot = 0, False, 0
+        self.last_win_lines = []  # check_paylines' win lines for the reels on screen, for the cell inspector
+        self.inspected = None
+        self.inspect_label = None
+
+        # Reels: a Label per cell, or a single Canvas
+        if reel_view == "canvas":
+            self.reel_labels = None
+            self.renderer = CanvasReelRenderer(root, rows, reels, text=theme["reel_symbol"], bg="black", fg=self.fg)
+            self.renderer.canvas.grid(row=0, column=0, rowspan=rows, columnspan=reels, padx=1, pady=1)
+            self.renderer.canvas.bind("<Motion>", lambda event: self.inspect_cell(self.renderer.cell_at(event.x, event.y)))
+            self.renderer.canvas.bind("<Leave>", lambda event: self.inspect_cell(None))
+        else:
+            self.reel_labels = [[tk.Label(root, text=theme["reel_symbol"], font=("Arial", 14), fg=self.fg, bg="black", width=3, height=2, borderwidth=1, relief="groove")
+                                for _ in range(reels)] for _ in range(rows)]
+            for i in range(rows):
+                for j in range(reels):
+                    self.reel_labels[i][j].grid(row=i, column=j, padx=1, pady=1)
+                    self.reel_labels[i][j].bind("<Enter>", lambda event, cell=(i, j): self.inspect_cell(cell))
+                    self.reel_labels[i][j].bind("<Leave>", lambda event: self.inspect_cell(None))
+            self.renderer = ReelRenderer(self.reel_labels, text=theme["reel_symbol"], bg="black", fg=self.fg)
+
+        # Balance, credits, jackpot, bet, and extra spins display, each bound to its state field
+        self.labels = LabelBinder(root)
+        self.balance_label = tk.Label(root, font=font, fg="white", bg="black")
+        self.balance_label.grid(row=rows, column=0, columnspan=reels, pady=1)
+        self.labels.bind(self.balance_label, lambda: (self.state.balance,), "Balance: {} coins".format)
+
+        self.credits_label = tk.Label(root, font=font, fg="white", bg="black")
+        self.credits_label.grid(row=rows+1, column=0, columnspan=reels, pady=1)
+        self.labels.bind(self.credits_label, lambda: (self.state.credits,), "Credits: {}".format)
+
+        self.jackpot_label = tk.Label(root, font=font, fg="white", bg="black")
+        self.jackpot_label.grid(row=rows+2, column=0, columnspan=reels, pady=1)
+        self.labels.bind(self.jackpot_label, lambda: (self.state.jackpot,), "Jackpot: {} coins".format)
+
+        self.bet_label = tk.Label(root, font=font, fg="white", bg="black")
+        self.bet_label.grid(row=rows+3, column=0, columnspan=reels, pady=1)
+        self.labels.bind(self.bet_label, lambda: (self.state.bet,), "Bet: {} coin(s)".format)
+
+        self.spins_label = tk.Label(root, font=font, fg="white", bg="black")
+        self.spins_label.grid(row=rows+4, column=0, columnspan=reels, pady=1)
+        self.labels.bind(self.spins_label, lambda: (self.state.extra_spins,), "Extra Spins: {}".format)
+
+        # Bet adjustment
+        tk.Label(root, text="Bet Amount:", font=font, fg="white", bg="black").grid(row=rows+5, column=0, pady=1)
+        self.bet_entry = tk.Entry(root, width=4, font=font)
+        self.bet_entry.insert(0, str(self.state.bet))
+        self.bet_entry.grid(row=rows+5, column=1, pady=1)
+        self.bet_plus = tk.Button(root, text="+", command=self.increase_bet, bg="green", fg="white", activebackground="lightgreen", font=font)
+        self.bet_plus.grid(row=rows+5, column=2, sticky="w", padx=1)
+        self.bet_minus = tk.Button(root, text="-", command=self.decrease_bet, bg="green", fg="white", activebackground="lightgreen", font=font)
+        self.bet_minus.grid(row=rows+5, column=2, sticky="e", padx=1)
+
+        # Payline display
+        self.payline_label = tk.Label(root, text="Paylines: None", font=font, fg="white", bg="black", justify="left")
+        self.payline_label.grid(row=0, column=reels+1, rowspan=3, padx=3, sticky="n")
+
+        # Status display
+        self.status_label = tk.Label(root, text="Welcome! Press Spin to play!", font=font, fg="blue", bg="black")
+        self.status_label.grid(row=rows+6, column=0, columnspan=reels+2, pady=1)
+
+        # Buttons
+        self.spin_button = tk.Button(root, text="Spin", command=self.spin, bg="red", fg="white", activebackground="pink", font=font)
+        self.spin_button.grid(row=rows+7, column=0, columnspan=2, pady=1)
+        self.quit_button = tk.Button(root, text="Quit", command=self.quit, bg="purple", fg="white", activebackground="violet", font=font)
+        self.quit_button.grid(row=rows+7, column=2, pady=1)
+        self.leaderboard_button = tk.Button(root, text="Leaderboard", command=self.show_leaderboard, bg="blue", fg="white", activebackground="lightblue", font=font)
+        self.leaderboard_button.grid(row=rows+7, column=3, columnspan=1, pady=1)
+        self.reset_button = tk.Button(root, text="Reset", command=self.reset_game_prompt, bg="orange", fg="white", activebackground="lightyellow", font=font)
+        self.reset_button.grid(row=rows+7, column=4, columnspan=1, pady=1)
+        self.turbo = tk.BooleanVar(value=False)
+        self.turbo_check = tk.Checkbutton(root, text="Turbo", variable=self.turbo, fg="white", bg="black", selectcolor="black", activebackground="black", activeforeground="white", font=font)
+        self.turbo_check.grid(row=rows+7, column=5, columnspan=1, pady=1)
+
+        # Autoplay: spin count, stop conditions and a Start/Stop button
+        tk.Label(root, text="Autoplay:", font=font, fg="white", bg="black").grid(row=rows+8, column=0, pady=1)
+        self.autoplay_entry = tk.Entry(root, width=5, font=font)
+        self.autoplay_entry.insert(0, "100")
+        self.autoplay_entry.grid(row=rows+8, column=1, pady=1)
+        tk.Label(root, text="Stop <", font=font, fg="white", bg="black").grid(row=rows+8, column=2, sticky="e", pady=1)
+        self.stop_below_entry = tk.Entry(root, width=5, font=font)
+        self.stop_below_entry.grid(row=rows+8, column=3, sticky="w", pady=1)
+        tk.Label(root, text="Win >", font=font, fg="white", bg="black").grid(row=rows+8, column=4, sticky="e", pady=1)
+        self.stop_win_entry = tk.Entry(root, width=5, font=font)
+        self.stop_win_entry.grid(row=rows+8, column=5, sticky="w", pady=1)
+        self.stop_on_bonus = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Bonus", variable=self.stop_on_bonus, fg="white", bg="black", selectcolor="black", activebackground="black", activeforeground="white", font=font).grid(row=rows+9, column=0, columnspan=2, pady=1)
+        self.stop_on_jackpot = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Jackpot", variable=self.stop_on_jackpot, fg="white", bg="black", selectcolor="black", activebackground="black", activeforeground="white", font=font).grid(row=rows+9, column=2, columnspan=2, pady=1)
+        self.autoplay_button = tk.Button(root, text="Autoplay", command=self.toggle_autoplay, bg="red", fg="white", activebackground="pink", font=font)
+        self.autoplay_button.grid(row=rows+9, column=4, columnspan=2, pady=1)
+        self.root.bind("<F12>", lambda event: self.toggle_profile_overlay())
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)  # Closing the window saves and flushes like the Quit button
+        self.root.update_idletasks()  # Map and paint the reels and controls now; the rest of the window follows at idle
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Build the stats and store panels once the reels and controls are on screen, then ask for the player's name."""
+        font = ("Arial", self.theme["font_size"], "bold")
+        reels = self.machine.reels
+        # Stats display
+        self.stats_label = tk.Label(self.root, font=font, fg="white", bg="black", justify="left")
+        self.stats_label.grid(row=0, column=reels, rowspan=3, padx=3, sticky="n")
+        # Every spin, free or paid, bumps stats.spins, and a reset replaces the SpinStats object
+        self.labels.bind(self.stats_label, lambda: (self.player_name, self.state.stats, self.state.stats.spins), self.format_stats)
+
+        # Store display
+        tk.Label(self.root, text="Store:", font=font, fg="white", bg="black").grid(row=3, column=reels, sticky="n", padx=3)
+        self.store_listbox = tk.Listbox(self.root, height=6, width=30, font=("Arial", self.theme["font_size"]), bg="black", fg="white", selectbackground="blue", selectforeground="white")
+        self.store_listbox.grid(row=4, column=reels, rowspan=2, padx=3, sticky="n")
+        for item, details in self.store_items.items():
+            self.store_listbox.insert(tk.END, f"{item}: {details['cost']} credits - {details['description']}")
+        self.buy_button = tk.Button(self.root, text="Buy Item", command=self.buy_item, bg="yellow", fg="black", activebackground="lightyellow", font=font,
+                                    state="disabled" if self.autoplay else "normal")  # --autoplay starts before this panel is built
+        self.buy_button.grid(row=6, column=reels, pady=1)
+
+        # Cell inspector: the paylines through the reel cell under the pointer
+        self.inspect_label = tk.Label(self.root, text=INSPECT_HINT, font=("Arial", self.theme["font_size"]), fg="white", bg="black",
+                                      justify="left", wraplength=220)
+        self.inspect_label.grid(row=3, column=reels+1, rowspan=3, padx=3, sticky="n")
+
+        if self.ask_player_name:
+            self.ask_player_name = False
+            self.root.update()
+            name = simpledialog.askstring("Player Name", "Enter your name:", parent=self.root)
+            if name and name.strip():
+                self.player_name = name
+                self.labels.schedule()
+
+    def inspect_cell(self, cell):
+        """Show the paylines through the hovered cell, marking the ones that won on screen; None restores the hint."""
+        if self.inspect_label is None or cell == self.inspected:
+            return
+        self.inspected = cell
+        self.update_inspector()
+
+    def update_inspector(self):
+        """Redraw the cell inspector for the cell under the pointer, e.g. after a spin changed which lines won."""
+        if self.inspected is None:
+            self.inspect_label.config(text=INSPECT_HINT)
+            return
+        row, col = self.inspected
+        lines = self.machine.lines_through(row, col)
+        won = [line_num for line_num, _, _, _ in self.last_win_lines if line_num in lines]
+        text = f"Row {row + 1}, reel {col + 1}: {len(lines)} payline(s)\n" + (", ".join(map(str, lines)) or "none")
+        if won:
+            text += f"\nWon: {', '.join(map(str, won))}"
+        self.inspect_label.config(text=text)
+
+    def get_stats_text(self):
+        """Return formatted stats text."""
+        return self.format_stats(self.player_name, self.state.stats, self.state.stats.spins)
+
+    def format_stats(self, player_name, stats, spins):
+        """Format the stats panel; the label binding only calls this when the player or spin count has changed."""
+        win_rate = (stats.wins / spins * 100) if spins > 0 else 0
+        text = (f"📊 {player_name}'s Stats\n"
+                f"Spins: {spins}\n"
+                f"Wins: {stats.wins}\n"
+                f"Won: {stats.total_won} coins + {stats.total_credits} credits\n"
+                f"Bet: {stats.total_bet}\n"
+                f"Win Rate: {win_rate:.1f}%")
+        if stats.sketch.count:  # Streaming stats, kept since they were added to the save
+            bonus, jackpot = stats.bonus_gaps.mean_interval(), stats.jackpot_gaps.mean_interval()
+            top_line = stats.top(stats.line_hits, 1)
+            text += (f"\nAvg Win: {stats.mean:.2f} ± {math.sqrt(stats.variance()):.2f}\n"
+                     f"p50/p90/p99: {stats.percentile(50):.0f}/{stats.percentile(90):.0f}/{stats.percentile(99):.0f}\n"
+                     f"Losing Streak: {stats.win_gaps.since} (max {stats.longest_losing_streak()})\n"
+                     f"Bonus: {f'every ~{bonus:.0f} spins' if bonus else 'none yet'}\n"
+                     f"Jackpot: {f'every ~{jackpot:.0f} spins' if jackpot else 'none yet'}\n"
+                     f"Top Line: {f'{top_line[0] + 1} ({stats.line_hits[top_line[0]]} hits)' if top_line else 'none yet'}")
+        return text
+
+    def get_leaderboard_text(self):
+        """Return formatted leaderboard text."""
+        leaderboard = load_leaderboard()
+        text = "🏆 Leaderboard\n"
+        for i, entry in enumerate(leaderboard, 1):
+            text += f"{i}. {entry['name']}: {entry['score']} coins\n"
+        return text if leaderboard else "No high scores yet!"
+
+    def show_leaderboard(self):
+        """Display leaderboard in a message box."""
+        messagebox.showinfo("Leaderboard", self.get_leaderboard_text())
+
+    def reset_game_prompt(self):
+        """Prompt for confirmation before resetting the game."""
+        if self.spinning or self.free_spins_left:  # A pending finalize_spin or free spin would pay into the fresh state
+            return
+        if messagebox.askyesno("Reset Game", "Are you sure you want to reset the game? This will delete all progress!"):
+            self.state = reset_game(self.machine)
+            if self.jackpot_pool:
+                self.state.jackpot = self.jackpot_pool.amount()  # The shared pool belongs to every machine, not this player
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+            self.labels.schedule()
+            self.payline_label.config(text="Paylines: None")
+            self.status_label.config(text="Game reset! Ready to spin!", fg="blue")
+            self.renderer.set_grid(bg="black", fg=self.fg)
+            self.renderer.flush()
+            self.saver.request(self.state)
+
+    def increase_bet(self):
+        """Increase bet by 1, up to 100 or current balance."""
+        if self.state.bet < 100 and self.state.bet < self.state.balance:
+            self.state.bet += 1
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+            self.labels.schedule()
+
+    def decrease_bet(self):
+        """Decrease bet by 1, down to 1."""
+        if self.state.bet > 1:
+            self.state.bet -= 1
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+            self.labels.schedule()
+
+    def buy_item(self):
+        """Handle purchasing an item from the store using credits."""
+        if self.spinning:
+            return
+        selection = self.store_listbox.curselection()
+        if not selection:
+            messagebox.showerror("Error", "Please select an item to purchase!")
+            return
+        item_name = list(self.store_items.keys())[selection[0]]
+        item = self.store_items[item_name]
+        if self.state.credits < item["cost"]:
+            messagebox.showerror("Error", "Insufficient credits to purchase this item!")
+            return
+        self.state.credits -= item["cost"]
+
+        if item_name == "Extra Spin":
+            self.state.extra_spins += 1
+            self.status_label.config(text="Purchased Extra Spin!", fg="blue")
+        elif item_name == "Balance Boost":
+            self.state.balance += 100
+            self.status_label.config(text="Purchased Balance Boost! +100 coins", fg="blue")
+        elif item_name == "Jackpot Boost":
+            self.state.jackpot = self.jackpot_pool.contribute(500) if self.jackpot_pool else self.state.jackpot + 500
+            self.status_label.config(text="Purchased Jackpot Boost! +500 to jackpot", fg="blue")
+        elif item_name == "Free Spins Purchase":
+            self.free_spins_mode(self.machine.spin_reels())
+            self.status_label.config(text="Purchased Free Spins! Enjoy 5 spins!", fg="blue")
+        elif item_name == "Mystery Prize":
+            prize_type = randomness.random_source.randbelow(3)
+            if prize_type == 0:
+                prize = randomness.random_source.randbelow(51) + 50  # 50-100 coins
+                self.state.balance += prize
+                self.status_label.config(text=f"Mystery Prize: {prize} coins!", fg="blue")
+            elif prize_type == 1:
+                prize = randomness.random_source.randbelow(51) + 50  # 50-100 credits
+                self.state.credits += prize
+                self.status_label.config(text=f"Mystery Prize: {prize} credits!", fg="blue")
+            else:
+                self.state.extra_spins += 1
+                self.status_label.config(text="Mystery Prize: 1 extra spin!", fg="blue")
+        elif item_name == self.theme["charm_item"]:
+            self.state.charm_active = True
+            self.status_label.config(text=f"{item_name} active for next spin!", fg="blue")
+
+        self.saver.request(self.state)
+        if self.state.bet > self.state.balance:
+            self.state.bet = max(1, self.state.balance) if self.state.balance >= 1 else 0
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+        self.labels.schedule()
+
+    def animate_spin(self, iterations=10, delay=100):
+        """Simulate spinning reels with cycling symbols."""
+        if iterations <= 0:
+            self.spinning = False
+            self.finalize_spin()
+            return
+        machine = self.machine
+        profiler = self.profiler
+        if profiler:
+            start = time.perf_counter()
+        for i in range(machine.rows):
+            for j in range(machine.reels):
+                next_idx = (machine.symbol_index.get(self.renderer.text(i, j), -1) + 1) % machine.symbol_count
+                self.renderer.set_cell(i, j, text=machine.symbols[next_idx], bg="black", fg=self.fg)
+        self.renderer.flush()
+        self.status_label.config(text="*Spinning sounds* Whirr... Click!", fg="blue")
+        if profiler:
+            profiler.lap("animate", start)
+        self.root.after(delay, lambda: self.animate_spin(iterations - 1, delay))
+
+    def finalize_spin(self):
+        """Display final reel results and process spin."""
+        profiler = self.profiler
+        if profiler:
+            start = mark = time.perf_counter()
+        reels = self.machine.spin_reels()
+        if profiler:
+            mark = profiler.lap("rng", mark)
+        self.renderer.set_grid(reels, bg="black", fg=self.fg)
+        if profiler:
+            mark = profiler.lap("render", mark)
+
+        payout, win_lines, extra_credits = self.machine.check_paylines(reels, self.state.bet, 2 if self.state.charm_active else 1)
+        if profiler:
+            mark = profiler.lap("paylines", mark)
+        jackpot_payout = self.machine.check_jackpot(self.state.bet, self.state.jackpot, self.jackpot_pool)
+        if self.jackpot_pool:
+            self.state.jackpot = self.jackpot_pool.amount()
+        elif jackpot_payout:
+            self.state.jackpot = self.machine.jackpot_base  # Every jackpot win resets it, with or without line wins
+        self.state.balance += payout + jackpot_payout
+        self.state.credits += extra_credits
+        bonus = self.machine.check_bonus(reels)
+        if profiler:
+            mark = profiler.lap("jackpot_bonus", mark)
+        self.state.stats.record(0 if self.state.is_extra_spin else self.state.bet, payout + jackpot_payout, extra_credits, win_lines, bonus, jackpot_payout > 0)
+        self.last_win_lines = win_lines
+        if profiler:
+            mark = profiler.lap("stats", mark)
+
+        self.payline_text = "Paylines: "
+        if win_lines:
+            self.payline_text += ", ".join(f"{line_num} ({self.machine.symbol_names[symbol]})" for line_num, symbol, _, _ in win_lines)
+            for row, col in self.machine.win_cells(win_lines):
+                self.renderer.set_cell(row, col, bg="lightgreen", fg=self.fg)
+            self.status_text, self.status_fg = f"Won {payout} coins + {extra_credits} credits on {len(win_lines)} payline(s)!", "green"
+        elif jackpot_payout:
+            self.status_text, self.status_fg = f"JACKPOT! Won {jackpot_payout} coins!", "purple"
+            save_leaderboard(self.state.balance, self.player_name)
+            self.renderer.set_grid(bg="gold", fg=self.fg)
+        else:
+            self.status_text, self.status_fg = "No win this time. Try again!", "red"
+            self.payline_text += "None"
+        if profiler:
+            mark = profiler.lap("render", mark)
+        if self.display_due():
+            self.refresh_display()
+            if profiler:
+                mark = time.perf_counter()
+
+        self.last_won, self.last_bonus, self.last_jackpot = payout + jackpot_payout, bonus, jackpot_payout
+        if self.journal:
+            self.journal.append(reels, self.state.bet, payout, extra_credits, jackpot_payout, bonus, extra_spin=self.state.is_extra_spin, player=self.player_name)
+            if profiler:
+                mark = profiler.lap("journal", mark)
+        if bonus:
+            self.free_spins_mode(reels)
+        self.state.charm_active = False  # Reset after spin
+        if profiler:
+            mark = time.perf_counter()
+        self.saver.request(self.state)
+        if profiler:
+            profiler.lap("save_request", mark)
+            self.end_profiled_spin(start)
+
+        if self.state.bet > self.state.balance:
+            self.state.bet = max(1, self.state.balance) if self.state.balance >= 1 else 0
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+            self.labels.schedule()
+
+        if not self.free_spins_left:  # A running bonus checks once it has paid out
+            self.check_game_over()
+            self.continue_autoplay()
+
+    def display_due(self):
+        """Return whether this spin should be drawn; turbo autoplay only redraws every `refresh_every` spins."""
+        auto = self.autoplay
+        return not (auto and self.turbo.get()) or (auto["played"] + 1) % auto["refresh_every"] == 0
+
+    def refresh_display(self):
+        """Push the staged reels and the latest spin's paylines, status and counters to the labels."""
+        profiler = self.profiler
+        if profiler:
+            mark = time.perf_counter()
+        self.renderer.flush()
+        if profiler:
+            mark = profiler.lap("render", mark)
+        self.payline_label.config(text=self.payline_text)
+        self.status_label.config(text=self.status_text, fg=self.status_fg)
+        self.labels.flush()
+        if self.inspected is not None:
+            self.update_inspector()
+        if profiler:
+            profiler.lap("labels", mark)
+
+    def end_profiled_spin(self, start):
+        """Close the profiled spin: time the whole of it, then time Tk's repaint, which runs at idle after the label updates."""
+        profiler = self.profiler
+        end = profiler.lap("spin", start)
+        profiler.commit()
+        self.root.after_idle(lambda: profiler.add("paint", time.perf_counter() - end))
+        self.collect_save_times()
+
+    def collect_save_times(self):
+        """Move the save thread's write timings into the profiler, which is only ever touched on the Tk thread."""
+        save_times = self.saver.save_times
+        while save_times:
+            self.profiler.add("save", save_times.popleft())
+
+    def toggle_profile_overlay(self):
+        """Show or hide the per-phase latency overlay (F12), starting an in-memory profiler if it is off."""
+        if self.profile_window is not None:
+            self.profile_window.destroy()
+            self.profile_window = None
+            return
+        if self.profiler is None:
+            self.profiler = SpinProfiler(path=None)  # Only --profile writes a file on quit
+            self.saver.timed = True
+        self.profile_window = tk.Toplevel(self.root)
+        self.profile_window.title("Spin Profile")
+        self.profile_window.configure(bg="black")
+        self.profile_window.protocol("WM_DELETE_WINDOW", self.toggle_profile_overlay)
+        self.profile_label = tk.Label(self.profile_window, font=("Courier", 9), fg="lightgreen", bg="black", justify="left")
+        self.profile_label.pack(padx=4, pady=4)
+        self.update_profile_overlay()
+
+    def update_profile_overlay(self):
+        """Refresh the overlay twice a second while it is open."""
+        if self.profile_window is None:
+            return
+        self.collect_save_times()
+        self.profile_label.config(text=self.profiler.report())
+        self.root.after(500, self.update_profile_overlay)
+
+    def delay(self, ms):
+        """Return the animation delay to schedule, collapsed to 0 in turbo mode."""
+        return 0 if self.turbo.get() else ms
+
+    def free_spins_mode(self, initial_reels):
+        """Start free spins mode; each spin is scheduled with root.after so the event loop stays responsive."""
+        self.spinning = True  # Blocks Spin and Buy until the bonus finishes
+        self.free_spins_left = self.machine.free_spins
+        self.free_spin_bet = self.state.bet
+        self.free_spin_winnings = 0
+        self.status_label.config(text=f"BONUS! {self.machine.free_spins} Free Spins!", fg="blue")
+        self.root.after(self.delay(1000), self.announce_free_spin)
+
+    def announce_free_spin(self):
+        """Show which free spin is coming up, then play it."""
+        spin = self.machine.free_spins - self.free_spins_left
+        self.status_label.config(text=f"Free Spin {spin + 1}/{self.machine.free_spins}...", fg="blue")
+        self.root.after(self.delay(500), self.play_free_spin)
+
+    def play_free_spin(self):
+        """Play one free spin and schedule the next step."""
+        profiler = self.profiler
+        if profiler:
+            mark = time.perf_counter()
+        reels = self.machine.spin_reels()
+        if profiler:
+            mark = profiler.lap("rng", mark)
+        self.renderer.set_grid(reels, bg="black", fg=self.fg)
+        if profiler:
+            mark = profiler.lap("render", mark)
+        payout, win_lines, extra_credits = self.machine.check_paylines(reels, self.free_spin_bet)
+        if profiler:
+            mark = profiler.lap("paylines", mark)
+        if self.journal:
+            self.journal.append(reels, self.free_spin_bet, payout, extra_credits, free_spin=True, player=self.player_name)
+            if profiler:
+                mark = profiler.lap("journal", mark)
+        self.free_spin_winnings += payout + extra_credits
+        self.state.credits += extra_credits
+        self.state.stats.record(0, payout + extra_credits, extra_credits, win_lines)  # end_free_spins pays the credits as coins too
+        self.last_win_lines = win_lines
+        if profiler:
+            mark = profiler.lap("stats", mark)
+        for row, col in self.machine.win_cells(win_lines):
+            self.renderer.set_cell(row, col, bg="lightgreen", fg=self.fg)
+        self.payline_text = "Paylines: " + (", ".join(f"{line_num} ({self.machine.symbol_names[symbol]})" for line_num, symbol, _, _ in win_lines) if win_lines else "None")
+        if self.display_due():
+            self.renderer.flush()
+            if profiler:
+                mark = profiler.lap("render", mark)
+            self.labels.flush()
+            self.payline_label.config(text=self.payline_text)
+            if self.inspected is not None:
+                self.update_inspector()
+            if profiler:
+                profiler.lap("labels", mark)
+        if profiler:
+            profiler.commit()
+        self.free_spins_left -= 1
+        self.root.after(self.delay(500), self.announce_free_spin if self.free_spins_left else self.end_free_spins)
+
+    def end_free_spins(self):
+        """Pay out the free spin winnings and hand control back to the player."""
+        self.state.balance += self.free_spin_winnings
+        self.last_won += self.free_spin_winnings
+        self.status_text, self.status_fg = f"Free Spins Done! Won {self.free_spin_winnings} coins", "blue"
+        self.status_label.config(text=self.status_text, fg=self.status_fg)
+        self.labels.schedule()
+        save_leaderboard(self.state.balance, self.player_name)
+        self.saver.request(self.state)
+
+        if self.state.bet > self.state.balance:
+            self.state.bet = max(1, self.state.balance) if self.state.balance >= 1 else 0
+            self.bet_entry.delete(0, tk.END)
+            self.bet_entry.insert(0, str(self.state.bet))
+        self.spinning = False
+        self.check_game_over()
+        self.continue_autoplay()
+
+    def check_game_over(self):
+        """End the game when the player is out of coins and spins."""
+        if self.state.balance <= 0 and self.state.extra_spins <= 0:
+            save_leaderboard(self.state.balance, self.player_name)
+            self.stop_autoplay("Out of coins and spins")
+            if self.interactive:
+                messagebox.showinfo("Game Over", f"You're out of coins and spins!\n{self.get_leaderboard_text()}")
+            else:
+                print(f"{Fore.YELLOW}Game over: out of coins and spins.{Style.RESET_ALL}")
+            self.quit()
+
+    def toggle_autoplay(self):
+        """Handle the Autoplay button: start with the entered spin count and stop conditions, or stop early."""
+        if self.autoplay:
+            self.stop_autoplay("Stopped by player")
+            return
+        try:
+            spins = int(self.autoplay_entry.get())
+            stop_below = int(self.stop_below_entry.get()) if self.stop_below_entry.get().strip() else None
+            stop_win_above = int(self.stop_win_entry.get()) if self.stop_win_entry.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "Autoplay spins and limits must be whole numbers!")
+            return
+        if spins < 1:
+            messagebox.showerror("Error", "Autoplay needs at least 1 spin!")
+            return
+        self.start_autoplay(spins, {"stop_below": stop_below, "stop_win_above": stop_win_above,
+                                    "stop_on_bonus": self.stop_on_bonus.get(), "stop_on_jackpot": self.stop_on_jackpot.get()})
+
+    def start_autoplay(self, spins, rules=None, refresh_every=1, on_done=None):
+        """Play up to `spins` spins back-to-back through spin(); in turbo mode labels are only redrawn every `refresh_every` spins."""
+        if self.spinning or self.autoplay:
+            return
+        self.autoplay = {"spins": spins, "played": 0, "rules": dict(AUTOPLAY_RULES, **(rules or {})), "refresh_every": max(1, refresh_every),
+                         "on_done": on_done, "in_flight": False, "total_won": 0, "bonuses": 0, "jackpots": 0, "start": time.perf_counter()}
+        self.autoplay_button.config(text="Stop")
+        self.set_manual_controls("disabled")  # A manual spin or bought bonus would collide with autoplay's own spins
+        self.root.after(0, self.autoplay_step)
+
+    def autoplay_step(self):
+        """Start the next autoplay spin, unless autoplay was stopped or the bet can no longer be paid."""
+        auto = self.autoplay
+        if auto is None:
+            return
+        if self.spinning:  # A spin or bonus started outside autoplay is still running: check again shortly
+            self.root.after(AUTOPLAY_DELAY, self.autoplay_step)
+            return
+        try:
+            bet = int(self.bet_entry.get())
+        except ValueError:
+            bet = 0
+        reason = autoplay_stop_reason(auto["rules"], self.state.balance, bet) if 1 <= bet <= 100 else "Bet must be between 1 and 100 coins"
+        if reason:
+            self.stop_autoplay(reason)
+            return
+        auto["in_flight"] = True
+        self.spin()
+
+    def set_manual_controls(self, state):
+        """Enable or disable the Spin and Buy Item buttons."""
+        self.spin_button.config(state=state)
+        if hasattr(self, "buy_button"):  # Built by finish_startup
+            self.buy_button.config(state=state)
+
+    def continue_autoplay(self):
+        """Count the autoplay spin that just finished and schedule the next one, or stop on a stop condition."""
+        auto = self.autoplay
+        if auto is None or not auto["in_flight"]:
+            return
+        auto["in_flight"] = False
+        auto["played"] += 1
+        auto["total_won"] += self.last_won
+        auto["bonuses"] += 1 if self.last_bonus else 0
+        auto["jackpots"] += 1 if self.last_jackpot else 0
+        reason = autoplay_stop_reason(auto["rules"], self.state.balance, self.state.bet, self.last_won, self.last_bonus, self.last_jackpot)
+        if reason is None and auto["played"] >= auto["spins"]:
+            reason = f"Finished {auto['spins']} spins"
+        if reason:
+            self.stop_autoplay(reason)
+        else:
+            self.root.after(self.delay(AUTOPLAY_DELAY), self.autoplay_step)
+
+    def stop_autoplay(self, reason):
+        """Stop autoplay, redraw everything turbo skipped and report a summary to `on_done`."""
+        auto, self.autoplay = self.autoplay, None
+        if auto is None:
+            return
+        self.autoplay_button.config(text="Autoplay")
+        self.set_manual_controls("normal")
+        if not self.free_spins_left:  # A bonus in progress keeps drawing its own spins
+            self.refresh_display()
+        self.status_text, self.status_fg = f"Autoplay stopped: {reason}", "blue"
+        self.status_label.config(text=self.status_text, fg=self.status_fg)
+        elapsed = time.perf_counter() - auto["start"]
+        summary = {"spins": auto["played"], "reason": reason, "balance": self.state.balance, "credits": self.state.credits,
+                   "jackpot": self.state.jackpot, "total_won": auto["total_won"], "bonuses": auto["bonuses"],
+                   "jackpots": auto["jackpots"], "elapsed": elapsed,
+                   "spins_per_second": auto["played"] / elapsed if elapsed else 0.0}
+        if auto["on_done"]:
+            auto["on_done"](summary)
+
+    def spin(self):
+        """Handle spin button click."""
+        if self.spinning:
+            return
+        try:
+            self.state.bet = int(self.bet_entry.get())
+            if self.state.bet < 1 or self.state.bet > 100:
+                messagebox.showerror("Error", "Bet must be between 1 and 100 coins!")
+                return
+            if self.state.bet > self.state.balance:
+                messagebox.showerror("Error", "Bet cannot exceed your balance!")
+                return
+            self.state.is_extra_spin = False
+            if self.state.extra_spins > 0:
+                self.state.extra_spins -= 1
+                if self.display_due():
+                    self.labels.schedule()
+                self.status_label.config(text="Using extra spin!", fg="blue")
+                self.state.is_extra_spin = True
+            else:
+                self.state.balance -= self.state.bet
+                if self.jackpot_pool:
+                    self.state.jackpot = self.jackpot_pool.contribute(self.state.bet * self.machine.jackpot_increment)
+                else:
+                    self.state.jackpot += self.state.bet * self.machine.jackpot_increment
+            self.spinning = True
+            self.animate_spin(0 if self.turbo.get() else 10)  # Turbo skips the cycling frames
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid number!")
+
+    def quit(self):
+        """Handle quit button click."""
+        self.stop_autoplay("Quit")
+        save_leaderboard(self.state.balance, self.player_name)
+        if self.interactive:
+            messagebox.showinfo("Thanks for playing!", f"Final balance: {self.state.balance} coins\n{self.get_stats_text()}\n\n{self.get_leaderboard_text()}")
+        self.saver.request(self.state)
+        self.saver.close()
+        if self.profiler and self.profiler.path:
+            self.collect_save_times()  # The worker has stopped, so this includes the final write
+            try:
+                self.profiler.dump()
+                print(f"Spin profile written to {self.profiler.path}")
+            except OSError as e:
+                print(f"{Fore.RED}Failed to write spin profile: {e}.{Style.RESET_ALL}")
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.jackpot_pool:
+            self.jackpot_pool.close()
+        self.root.quit()
@@ -0,0 +1,135 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from .machine import load_numpy, _require_numpy
+
+# Append-only binary spin journal: a 16-byte header, then one fixed-width little-endian record per spin
+JOURNAL_MAGIC = b"SLOTJRN1"
+JOURNAL_HEADER = struct.Struct("<8sBBHI")  # magic, rows, reels, record size, reserved
+JOURNAL_BONUS, JOURNAL_FREE_SPIN, JOURNAL_EXTRA_SPIN = 1, 2, 4  # Flag bits
+
+def journal_file(machine):
+    """Return the default journal path for a machine's grid size."""
+    return f"slot_machine_journal_{machine.rows}x{machine.reels}.bin"
+
+def journal_grid_bytes(machine):
+    return (machine.rows * machine.reels + 1) // 2  # Two 4-bit symbol indices per byte
+
+def journal_record(machine):
+    """Return the record layout for a machine: timestamp, player CRC, bet, payout, extra credits, jackpot, flags, grid."""
+    return struct.Struct(f"<dIIIIIB{journal_grid_bytes(machine)}s")
+
+class SpinJournal:
+    """Append one fixed-width record per spin to the journal file."""
+    def __init__(self, machine, path=None):
+        self.machine = machine
+        self.path = path or journal_file(machine)
+        self.record = journal_record(machine)
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, machine.rows, machine.reels, self.record.size, 0))
+            self._file.flush()
+
+    def append(self, reels, bet, payout, extra_credits, jackpot_payout=0, bonus=False, free_spin=False, extra_spin=False, player=""):
+        flags = (JOURNAL_BONUS if bonus else 0) | (JOURNAL_FREE_SPIN if free_spin else 0) | (JOURNAL_EXTRA_SPIN if extra_spin else 0)
+        self._file.write(self.record.pack(time.time(), zlib.crc32(player.encode()), int(bet), int(payout),
+                                          int(extra_credits), int(jackpot_payout), flags, self.machine.pack_grid(reels)))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class JournalReader:
+    """Memory-map a spin journal so records can be scanned without reading or parsing the file up front."""
+    def __init__(self, machine, path=None):
+        self.machine = machine
+        self.record = journal_record(machine)
+        path = path or journal_file(machine)
+        self._file = open(path, "rb")
+        # Shorter than a header (e.g. the writer crashed right after creating it): mmap and unpack would fail obscurely
+        if os.fstat(self._file.fileno()).st_size < JOURNAL_HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a {machine.rows}x{machine.reels} spin journal.")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, rows, reels, record_size, _ = JOURNAL_HEADER.unpack_from(self._map)
+        if magic != JOURNAL_MAGIC or (rows, reels, record_size) != (machine.rows, machine.reels, self.record.size):
+            self.close()
+            raise ValueError(f"{path} is not a {machine.rows}x{machine.reels} spin journal.")
+        # A record cut short by a crash while appending is ignored
+        self.count = (len(self._map) - JOURNAL_HEADER.size) // self.record.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("journal record out of range")
+        timestamp, player, bet, payout, extra_credits, jackpot_payout, flags, grid = self.record.unpack_from(
+            self._map, JOURNAL_HEADER.size + index * self.record.size)
+        return {"timestamp": timestamp, "player": player, "bet": bet, "payout": payout, "extra_credits": extra_credits,
+                "jackpot_payout": jackpot_payout, "bonus": bool(flags & JOURNAL_BONUS),
+                "free_spin": bool(flags & JOURNAL_FREE_SPIN), "extra_spin": bool(flags & JOURNAL_EXTRA_SPIN),
+                "reels": self.machine.unpack_grid(grid)}
+
+    def records(self):
+        """Return every record as a zero-copy NumPy structured array over the mapped file."""
+        np = _require_numpy()
+        dtype = np.dtype([("timestamp", "<f8"), ("player", "<u4"), ("bet", "<u4"), ("payout", "<u4"),
+                          ("extra_credits", "<u4"), ("jackpot_payout", "<u4"), ("flags", "u1"),
+                          ("grid", "u1", (journal_grid_bytes(self.machine),))])
+        return np.frombuffer(self._map, dtype=dtype, count=self.count, offset=JOURNAL_HEADER.size)
+
+    def grids(self):
+        """Return every grid as an (N, rows, reels) uint8 array of symbol indices, like spin_reels_batch."""
+        np = _require_numpy()
+        rows, reels = self.machine.rows, self.machine.reels
+        packed = self.records()["grid"]
+        cells = np.stack((packed >> 4, packed & 15), axis=2).reshape(len(packed), -1)
+        return cells[:, :rows * reels].reshape(len(packed), rows, reels)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def _journal_totals(records):
+    """Vectorized journal totals; returns plain ints so no view of the mapped file outlives the call."""
+    np = _require_numpy()
+    paid = (records["flags"] & (JOURNAL_FREE_SPIN | JOURNAL_EXTRA_SPIN)) == 0
+    return (len(records),
+            int(records["bet"][paid].sum(dtype=np.int64)),
+            int(records["payout"].sum(dtype=np.int64)) + int(records["jackpot_payout"].sum(dtype=np.int64)),
+            int(((records["payout"] > 0) | (records["jackpot_payout"] > 0)).sum()),
+            int((records["flags"] & JOURNAL_BONUS).astype(bool).sum()),
+            len(np.unique(records["player"])))
+
+def get_journal_report(machine, path=None):
+    """Return formatted totals for a spin journal, scanned through the memory map."""
+    path = path or journal_file(machine)
+    reader = JournalReader(machine, path)
+    try:
+        if load_numpy() is not None:
+            spins, total_bet, total_won, wins, bonuses, players = _journal_totals(reader.records())
+        else:
+            record = reader.record
+            spins, total_bet, total_won, wins, bonuses, player_ids = len(reader), 0, 0, 0, 0, set()
+            for _, player, bet, payout, _, jackpot_payout, flags, _ in record.iter_unpack(
+                    reader._map[JOURNAL_HEADER.size:JOURNAL_HEADER.size + spins * record.size]):
+                total_bet += 0 if flags & (JOURNAL_FREE_SPIN | JOURNAL_EXTRA_SPIN) else bet
+                total_won += payout + jackpot_payout
+                wins += 1 if payout or jackpot_payout else 0
+                bonuses += 1 if flags & JOURNAL_BONUS else 0
+                player_ids.add(player)
+            players = len(player_ids)
+    finally:
+        reader.close()
+    rtp = f"{total_won / total_bet * 100:.3f}%" if total_bet else "n/a"
+    return (f"Journal: {path} ({machine.rows}x{machine.reels})\n"
+            f"Spins: {spins} ({players} player(s))\n"
+            f"Coins bet: {total_bet}\n"
+            f"Coins won: {total_won}\n"
+            f"RTP: {rtp}\n"
+            f"Winning spins: {wins}\n"
+            f"Bonuses: {bonuses}")
@@ -0,0 +1,105 @@
+"""Load generator for the game server: many concurrent players spinning over TCP, with throughput and latency figures.
+
+Start a server from a variant script, then run this from the "Slot Machine Scripts" directory:
+
+    python "OGens CL4X Tkinter Slot Machine 8x8 v3.4.py" --serve
+    python -m slot_engine.loadgen --players 2000 --spins 50
+
+Each simulated player opens its own connection, logs in as <prefix>-<n>, and spins back-to-back until it has played
+--spins spins or can no longer cover the bet. Latency is the round trip of every request, including the login.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .server import MAX_REQUEST, SERVER_HOST, SERVER_PORT
+
+async def _player(host, port, name, spins, bet, latencies):
+    """Play one session; return (spins played, error or None)."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_REQUEST)
+    except OSError as e:
+        return 0, f"connect failed: {e}"
+    played = 0
+
+    async def call(request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+        latencies.append(time.perf_counter() - start)
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    try:
+        reply = await call({"op": "login", "player": name})
+        if not reply["ok"]:
+            return 0, reply["error"]
+        for _ in range(spins):
+            if reply["balance"] < bet and not reply["extra_spins"]:
+                break  # Out of coins: a real player would stop here too
+            reply = await call({"op": "spin", "bet": bet})
+            if not reply["ok"]:
+                return played, reply["error"]
+            played += 1
+        writer.write(b'{"op": "quit"}\n')
+        await writer.drain()
+        return played, None
+    except (OSError, ValueError) as e:
+        return played, str(e)
+    finally:
+        writer.close()
+
+async def run_load(host=SERVER_HOST, port=SERVER_PORT, players=100, spins=50, bet=1, prefix="load"):
+    """Run `players` concurrent sessions against a server and return throughput and latency percentiles."""
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_player(host, port, f"{prefix}-{n}", spins, bet, latencies) for n in range(players)))
+    elapsed = time.perf_counter() - start
+    errors = [error for _, error in results if error]
+    latencies.sort()
+    percentile = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000 if latencies else 0.0
+    return {
+        "players": players,
+        "spins": sum(played for played, _ in results),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+def get_load_report(result):
+    """Return a formatted load test summary."""
+    text = (f"Players: {result['players']}\n"
+            f"Spins: {result['spins']} ({result['requests']} requests in {result['elapsed']:.2f}s)\n"
+            f"Throughput: {result['requests_per_second']:,.0f} requests/s\n"
+            f"Latency: p50 {result['p50_ms']:.2f} ms, p90 {result['p90_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+            f"max {result['max_ms']:.2f} ms\n"
+            f"Errors: {result['errors']}")
+    if result["first_error"]:
+        text += f" (first: {result['first_error']})"
+    return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test a running slot machine game server")
+    parser.add_argument("--host", default=SERVER_HOST, help=f"server host (default: {SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help=f"server port (default: {SERVER_PORT})")
+    parser.add_argument("--players", type=int, default=100, help="concurrent player sessions (default: 100)")
+    parser.add_argument("--spins", type=int, default=50, help="spins per player (default: 50)")
+    parser.add_argument("--bet", type=int, default=1, help="bet per spin (default: 1)")
+    parser.add_argument("--prefix", default="load", help="player names are PREFIX-0, PREFIX-1, ... (default: load)")
+    args = parser.parse_args(argv)
+    result = asyncio.run(run_load(args.host, args.port, args.players, args.spins, args.bet, args.prefix))
+    print(get_load_report(result))
+    return 1 if result["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import math
+
+from . import randomness
+
+np = None  # NumPy is only needed by the batch engine, so it is imported on first use
+_numpy_missing = False
+
+FREE_SPINS = 5
+JACKPOT_BASE = 1000
+JACKPOT_INCREMENT = 1
+
+def load_numpy():
+    """Import NumPy the first time it is needed; return the module, or None when it is not installed."""
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            _numpy_missing = True
+    return np
+
+def _require_numpy():
+    if load_numpy() is None:
+        raise ImportError("The batch engine requires NumPy (pip install numpy).")
+    return np
+
+def _bounce(start, step, low, high, length):
+    """Return `length` columns walked from `start` by `step`, reflecting off the [low, high] window."""
+    cols, col = [], start
+    for _ in range(length):
+        cols.append(col)
+        if not low <= col + step <= high:
+            step = -step
+        col += step
+    return cols
+
+def generate_paylines(rows, reels):
+    """Build a payline set for any rows x reels grid: every row and column, then diagonals, V-shapes, W-shapes and zigzags."""
+    lines = [[(row, col) for col in range(reels)] for row in range(rows)]
+    lines += [[(row, col) for row in range(rows)] for col in range(reels)]
+    # Shaped lines take one cell per row, bouncing between two columns; (window width, step) per shape
+    shapes = [(reels, 1), ((reels + 1) // 2, 1), (reels, 2)]
+    windows = [(0, width - 1, step) for width, step in shapes]
+    windows += [(reels - width, reels - 1, step) for width, step in shapes]
+    windows += [(col, col + 1, 1) for col in range(reels - 1)]  # Zigzags across each pair of neighbouring reels
+    for low, high, step in windows:
+        if high - low < step:
+            continue
+        for start, direction in ((low, step), (high, -step)):
+            line = list(enumerate(_bounce(start, direction, low, high, rows)))
+            if line not in lines:
+                lines.append(line)
+    return lines
+
+class Machine:
+    """A slot machine definition (grid, symbols, paytable, wild, paylines, bonus rule) and the evaluator compiled from it."""
+    def __init__(self, symbols, rows, reels, payouts, wild_symbol, low_symbols=(), paylines=None, symbol_names=None,
+                 bonus_symbol=None, bonus_row=None, free_spins=FREE_SPINS, jackpot_base=JACKPOT_BASE,
+                 jackpot_increment=JACKPOT_INCREMENT, line_rules=None, name="Slot Machine", compiled_paylines=None):
+        if len(symbols) > 16:
+            raise ValueError("A machine can have at most 16 symbols (grids are stored as 4-bit indices).")
+        if wild_symbol not in symbols:
+            raise ValueError(f"Wild symbol {wild_symbol} is not one of the machine's symbols.")
+        self.name = name
+        self.symbols = list(symbols)
+        self.rows = rows
+        self.reels = reels
+        self.symbol_count = len(self.symbols)
+        self.payouts = dict(payouts)
+        self.wild_symbol = wild_symbol
+        self.low_symbols = list(low_symbols)
+        self.paylines = paylines if paylines is not None else generate_paylines(rows, reels)
+        for line in self.paylines:
+            if not all(0 <= row < rows and 0 <= col < reels for row, col in line):
+                raise ValueError(f"Payline {line} does not fit a {rows}x{reels} grid.")
+        self.symbol_names = symbol_names or {symbol: symbol for symbol in self.symbols}
+        self.bonus_row = rows // 2 if bonus_row is None else bonus_row  # Middle row by default
+        self.bonus_trigger = [bonus_symbol or wild_symbol] * reels
+        self.free_spins = free_spins
+        self.jackpot_base = jackpot_base
+        self.jackpot_increment = jackpot_increment
+        # Short-line rules, first match wins; "shorter_than" defaults to a full row. The default halves every
+        # multiplier on short lines, except low symbols, which pay 1.
+        self.line_rules = line_rules if line_rules is not None else [{"symbols": self.low_symbols, "multiplier": 1}, {"divide": 2}]
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.wild_index = self.symbol_index[wild_symbol]
+        self.compiled_paylines = compiled_paylines or self.compile_paylines()
+        self.cell_lines = self.index_cells()
+        self._batch = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_batch"] = None  # Rebuilt on demand in the receiving process
+        return state
+
+    def with_grid(self, rows, reels):
+        """Return the same machine resized to rows x reels, with procedurally generated paylines."""
+        return Machine(self.symbols, rows, reels, self.payouts, self.wild_symbol, self.low_symbols,
+                       symbol_names=self.symbol_names, bonus_symbol=self.bonus_trigger[0], free_spins=self.free_spins,
+                       jackpot_base=self.jackpot_base, jackpot_increment=self.jackpot_increment,
+                       line_rules=self.line_rules, name=self.name)
+
+    def to_definition(self):
+        """Return the machine as a definition dict in the format read by load_machine."""
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "reels": self.reels,
+            "symbols": self.symbols,
+            "names": self.symbol_names,
+            "payouts": self.payouts,
+            "wild": self.wild_symbol,
+            "low_symbols": self.low_symbols,
+            "line_rules": self.line_rules,
+            "paylines": [[list(cell) for cell in line] for line in self.paylines],
+            "bonus": {"symbol": self.bonus_trigger[0], "row": self.bonus_row},
+            "free_spins": self.free_spins,
+            "jackpot": {"base": self.jackpot_base, "increment": self.jackpot_increment},
+        }
+
+    def line_multiplier(self, symbol, length):
+        """Apply the paytable and the first matching short-line rule to a symbol on a line of `length` cells."""
+        multiplier = self.payouts.get(symbol, 0)
+        for rule in self.line_rules:
+            if length < rule.get("shorter_than", self.reels) and symbol in rule.get("symbols", self.symbols):
+                return rule["multiplier"] if "multiplier" in rule else multiplier // rule["divide"]
+        return multiplier
+
+    def compile_paylines(self):
+        """Precompile paylines into (cell bitmask, cell positions, per-symbol multipliers) tuples."""
+        compiled = []
+        for line in self.paylines:
+            positions = tuple(row * self.reels + col for row, col in line)
+            mask = 0
+            for pos in positions:
+                mask |= 1 << pos
+            multipliers = tuple(self.line_multiplier(symbol, len(line)) for symbol in self.symbols)
+            compiled.append((mask, positions, multipliers))
+        return compiled
+
+    def index_cells(self):
+        """Build the inverse payline index: per cell position (row * reels + col), the 0-based indices of the paylines through it."""
+        index = [[] for _ in range(self.rows * self.reels)]
+        for i, (_, positions, _) in enumerate(self.compiled_paylines):
+            for pos in sorted(set(positions)):
+                index[pos].append(i)
+        return tuple(tuple(lines) for lines in index)
+
+    def lines_through(self, row, col):
+        """Return the numbers (1-based, as in check_paylines) of the paylines that pass through a cell."""
+        return [i + 1 for i in self.cell_lines[row * self.reels + col]]
+
+    def win_cells(self, win_lines):
+        """Return the (row, col) cells of check_paylines' win lines, each cell once however many lines share it."""
+        compiled = self.compiled_paylines
+        mask = 0
+        for line_num, _, _, _ in win_lines:
+            mask |= compiled[line_num - 1][0]
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(divmod(low.bit_length() - 1, self.reels))
+            mask ^= low
+        return cells
+
+    def spin_reels(self):
+        """Spin the reels and return a rows x reels grid of random symbols using true randomness."""
+        symbols, reels = self.symbols, self.reels
+        cells = [symbols[index] for index in randomness.random_source.indices(self.symbol_count, self.rows * reels)]
+        return [cells[row * reels:(row + 1) * reels] for row in range(self.rows)]
+
+    def encode_reels(self, reels):
+        """Encode a grid as flat symbol indices plus one bitboard per symbol with wild cells OR-ed in."""
+        symbol_index = self.symbol_index
+        cells = [symbol_index[symbol] for row in reels for symbol in row]
+        boards = [0] * self.symbol_count
+        for pos, symbol in enumerate(cells):
+            boards[symbol] |= 1 << pos
+        wild = boards[self.wild_index]
+        for symbol in range(self.symbol_count):
+            boards[symbol] |= wild
+        return cells, boards
+
+    def check_paylines(self, reels, bet, multiplier=1):
+        """Check every payline for wins, including wild substitutions, and award random credits."""
+        payout = 0
+        win_lines = []
+        extra_credits = 0
+        wild_index = self.wild_index
+        cells, boards = self.encode_reels(reels)
+        for i, (mask, positions, multipliers) in enumerate(self.compiled_paylines):
+            ref = cells[positions[0]]
+            if ref == wild_index and mask & boards[wild_index] != mask:
+                ref = next(cells[pos] for pos in positions if cells[pos] != wild_index)
+            if mask & boards[ref] == mask:
+                line_payout = math.floor(bet * multipliers[ref])
+                payout += line_payout
+                extra_credits += (randomness.random_source.randbelow(50) + 1) * multiplier
+                win_lines.append((i + 1, self.symbols[ref], line_payout, self.paylines[i]))
+        return payout, win_lines, extra_credits
+
+    def check_bonus(self, reels):
+        """Check if the bonus row is filled with the bonus symbol."""
+        return reels[self.bonus_row] == self.bonus_trigger
+
+    def jackpot_hit(self, bet):
+        """Draw the jackpot chance: 1 in 1000 for bets 1-100."""
+        return 1 <= bet <= 100 and randomness.random_source.randbelow(1000) == 0
+
+    def check_jackpot(self, bet, jackpot, pool=None):
+        """Check for a jackpot win (1 in 1000 chance for bets 1-100), claiming the shared pool when one is given."""
+        if self.jackpot_hit(bet):
+            return pool.claim() if pool is not None else int(jackpot)
+        return 0
+
+    # NumPy batch engine: grids are (N, rows, reels) uint8 arrays of symbol indices
+    def _batch_tables(self):
+        if self._batch is None:
+            _require_numpy()
+            # Lines are padded to equal length by repeating their first cell, which never changes a result
+            width = max(len(positions) for _, positions, _ in self.compiled_paylines)
+            index = np.array([positions + (positions[0],) * (width - len(positions))
+                              for _, positions, _ in self.compiled_paylines], dtype=np.intp)
+            multipliers = np.array([multipliers for _, _, multipliers in self.compiled_paylines], dtype=np.int64)
+            trigger = np.array([self.symbol_index[symbol] for symbol in self.bonus_trigger], dtype=np.uint8)
+            self._batch = (index, multipliers, trigger)
+        return self._batch
+
+    def spin_reels_batch(self, n, rng=None):
+        """Spin n grids at once and return an (n, rows, reels) uint8 array of symbol indices."""
+        _require_numpy()
+        rng = rng if rng is not None else np.random.default_rng()
+        return rng.integers(0, self.symbol_count, size=(n, self.rows, self.reels), dtype=np.uint8)
+
+    def decode_reels(self, grid):
+        """Convert one grid of symbol indices back into the nested symbol lists used by check_paylines."""
+        return [[self.symbols[index] for index in row] for row in grid]
+
+    def check_paylines_batch(self, grids, bet, multiplier=1, rng=None, with_symbols=False):
+        """Evaluate every payline of every grid; return (payouts, win_masks, extra_credits) arrays, plus each line's symbol index with `with_symbols`."""
+        index, multipliers, _ = self._batch_tables()
+        rng = rng if rng is not None else np.random.default_rng()
+        cells = grids.reshape(len(grids), -1)[:, index]  # (N, lines, width)
+        wild = cells == self.wild_index
+        first = np.argmax(~wild, axis=2)  # first non-wild cell, or 0 for an all-wild line
+        ref = np.take_along_axis(cells, first[..., None], axis=2)
+        win_masks = np.all((cells == ref) | wild, axis=2)
+        line_multipliers = multipliers[np.arange(len(multipliers)), ref[..., 0]]
+        line_payouts = np.floor(bet * line_multipliers).astype(np.int64)
+        payouts = np.where(win_masks, line_payouts, 0).sum(axis=1)
+        credits = rng.integers(1, 51, size=win_masks.shape, dtype=np.int64) * multiplier
+        extra_credits = np.where(win_masks, credits, 0).sum(axis=1)
+        if with_symbols:
+            return payouts, win_masks, extra_credits, ref[..., 0]
+        return payouts, win_masks, extra_credits
+
+    def check_bonus_batch(self, grids):
+        """Return a bool array flagging the grids whose bonus row triggers the bonus."""
+        _, _, trigger = self._batch_tables()
+        return np.all(grids[:, self.bonus_row, :] == trigger, axis=1)
+
+    def pack_grid(self, reels):
+        """Pack a grid into bytes holding two 4-bit symbol indices each, row-major."""
+        cells = [self.symbol_index[symbol] for row in reels for symbol in row]
+        if len(cells) % 2:
+            cells.append(0)
+        return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, len(cells), 2))
+
+    def unpack_grid(self, packed):
+        """Return the symbol grid stored by pack_grid."""
+        cells = [nibble for byte in packed for nibble in (byte >> 4, byte & 15)]
+        return [[self.symbols[cells[row * self.reels + col]] for col in range(self.reels)] for row in range(self.rows)]
@@ -0,0 +1,90 @@
+import time
+
+from .stats import QuantileSketch
+from .storage import write_json_atomic
+
+PROFILE_FILE = "slot_machine_profile.json"
+# Spin phases in pipeline order; the report lists them in this order, then any others
+PHASES = ("animate", "rng", "paylines", "jackpot_bonus", "stats", "render", "labels", "journal", "save_request", "paint", "save", "spin")
+PHASE_NAMES = {
+    "animate": "Spin animation frames",
+    "rng": "RNG (spin_reels)",
+    "paylines": "Paylines (check_paylines)",
+    "jackpot_bonus": "Jackpot/bonus checks",
+    "stats": "Stats update",
+    "render": "Reel rendering",
+    "labels": "Label/stats text",
+    "journal": "Journal append",
+    "save_request": "Save snapshot (GUI thread)",
+    "paint": "Tk paint (idle)",
+    "save": "save_game I/O (worker)",
+    "spin": "Whole finalize_spin",
+}
+
+class PhaseTiming:
+    """Count, total, maximum and a quantile sketch of one phase's durations, in milliseconds."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sketch = QuantileSketch()
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.sketch.add(ms)
+
+class SpinProfiler:
+    """Time each phase of a spin. Call sites keep `profiler` as None when profiling is off, so the hooks cost one test.
+
+    A profiler whose path is None keeps its timings in memory only; dump() then needs an explicit path.
+    """
+    def __init__(self, path=PROFILE_FILE):
+        self.path = path
+        self.phases = {}
+        self._spin = {}  # Per-phase seconds for the spin in progress; a phase can be timed in several pieces
+
+    def add(self, phase, seconds):
+        timing = self.phases.get(phase)
+        if timing is None:
+            timing = self.phases[phase] = PhaseTiming()
+        timing.add(seconds * 1000)
+
+    def lap(self, phase, start):
+        """Add the time since `start` (a perf_counter value) to `phase` for the current spin and return the current perf_counter."""
+        now = time.perf_counter()
+        self._spin[phase] = self._spin.get(phase, 0.0) + (now - start)
+        return now
+
+    def commit(self):
+        """Record the current spin's per-phase totals as one sample each."""
+        for phase, seconds in self._spin.items():
+            self.add(phase, seconds)
+        self._spin = {}
+
+    def summary(self):
+        """Return {phase: {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, total_ms}} in pipeline order."""
+        summary = {}
+        for phase in [phase for phase in PHASES if phase in self.phases] + sorted(set(self.phases) - set(PHASES)):
+            timing = self.phases[phase]
+            p50, p90, p99 = (min(timing.sketch.quantile(q), timing.max) for q in (0.5, 0.9, 0.99))  # Sketch midpoints can overshoot
+            summary[phase] = {"count": timing.count, "mean_ms": timing.total / timing.count, "p50_ms": p50, "p90_ms": p90,
+                              "p99_ms": p99, "max_ms": timing.max, "total_ms": timing.total}
+        return summary
+
+    def report(self):
+        """Return the summary as a fixed-width table."""
+        summary = self.summary()
+        if not summary:
+            return "No spins profiled yet."
+        lines = [f"{'Phase':<28}{'n':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for phase, row in summary.items():
+            lines.append(f"{PHASE_NAMES.get(phase, phase):<28}{row['count']:>7}{row['p50_ms']:>9.3f}{row['p90_ms']:>9.3f}"
+                         f"{row['p99_ms']:>9.3f}{row['max_ms']:>9.3f}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        """Write the summary to `path` (default: the profiler's path) as JSON."""
+        write_json_atomic(path or self.path, {"created": time.time(), "phases": self.summary()})
@@ -0,0 +1,147 @@
+import os
+import random
+import secrets
+import weakref
+from array import array
+
+# Buffered cryptographic sources alive in this process. One fork hook empties their buffers in the child, so a worker
+# never replays the parent's bytes; the set holds them weakly, so a dropped source is freed with its buffer.
+_crypto_sources = weakref.WeakSet()
+
+def _discard_after_fork():
+    for source in list(_crypto_sources):
+        source._discard()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_discard_after_fork)
+
+# Random sources: anything with randbelow(n), choice(seq) and indices(n, count) can drive the game
+class SecretsRandom:
+    """Unbuffered source that asks the OS for every draw through the secrets module."""
+    def randbelow(self, n):
+        return secrets.randbelow(n)
+
+    def choice(self, seq):
+        return secrets.choice(seq)
+
+    def indices(self, n, count):
+        return [secrets.randbelow(n) for _ in range(count)]
+
+class BufferedCryptoRandom:
+    """Cryptographic source that serves unbiased draws from a refillable block of secrets.token_bytes."""
+    discard_on_fork = True  # Seeded sources keep their buffer, so a forked replay stays deterministic
+
+    def __init__(self, block_size=65536):
+        self.block_size = block_size
+        self._buffer = b""
+        self._pos = 0
+        if self.discard_on_fork:
+            _crypto_sources.add(self)
+
+    def _discard(self):
+        self._buffer = b""
+        self._pos = 0
+
+    def _random_bytes(self, size):
+        return secrets.token_bytes(size)
+
+    def _take(self, count):
+        """Return the next `count` random bytes, refilling the buffer as needed."""
+        if self._pos + count > len(self._buffer):
+            self._buffer = self._buffer[self._pos:] + self._random_bytes(max(self.block_size, count))
+            self._pos = 0
+        chunk = self._buffer[self._pos:self._pos + count]
+        self._pos += count
+        return chunk
+
+    def _draw(self, n):
+        """Return a uniform integer in [0, n) by rejection sampling whole bytes."""
+        if n <= 0:
+            raise ValueError("Upper bound must be positive.")
+        if n <= 256:
+            limit = 256 - 256 % n
+            while True:
+                value = self._take(1)[0]
+                if value < limit:
+                    return value % n
+        bits = (n - 1).bit_length()
+        size = (bits + 7) // 8
+        mask = (1 << bits) - 1
+        while True:
+            value = int.from_bytes(self._take(size), "big") & mask
+            if value < n:
+                return value
+
+    def randbelow(self, n):
+        return self._draw(n)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randbelow(len(seq))]
+
+    def indices(self, n, count):
+        """Return `count` uniform integers in [0, n), one byte per draw for n <= 256."""
+        if n > 256:
+            return [self._draw(n) for _ in range(count)]
+        if n & (n - 1) == 0:  # Power of two: masking a byte is already unbiased
+            return [value & (n - 1) for value in self._take(count)]
+        limit = 256 - 256 % n
+        result = []
+        while len(result) < count:
+            result.extend(value % n for value in self._take(count - len(result)) if value < limit)
+        return result
+
+class SeededRandom(BufferedCryptoRandom):
+    """Deterministic source for replays and regression runs; optionally records every draw it serves."""
+    discard_on_fork = False
+
+    def __init__(self, seed, record=False, block_size=65536):
+        super().__init__(block_size)
+        self.seed = seed
+        self._random = random.Random(seed)
+        self.draws = array("I") if record else None
+
+    def _random_bytes(self, size):
+        return self._random.randbytes(size)
+
+    def randbelow(self, n):
+        value = self._draw(n)
+        if self.draws is not None:
+            self.draws.append(value)
+        return value
+
+    def indices(self, n, count):
+        values = super().indices(n, count)
+        if self.draws is not None:
+            self.draws.extend(values)
+        return values
+
+class ReplayRandom:
+    """Source that serves a recorded draw sequence back and fails loudly if the engine consumes it differently."""
+    def __init__(self, draws):
+        self._draws = draws
+        self._pos = 0
+
+    def randbelow(self, n):
+        if self._pos >= len(self._draws):
+            raise ValueError("Replay ran past the end of the recorded draws.")
+        value = self._draws[self._pos]
+        if value >= n:
+            raise ValueError(f"Replay diverged at draw {self._pos}: recorded {value} is not below {n}.")
+        self._pos += 1
+        return value
+
+    def choice(self, seq):
+        return seq[self.randbelow(len(seq))]
+
+    def indices(self, n, count):
+        return [self.randbelow(n) for _ in range(count)]
+
+random_source = BufferedCryptoRandom()
+
+def set_random_source(source):
+    """Swap the source used for all game draws and return the previous one."""
+    global random_source
+    previous, random_source = random_source, source
+    return previous
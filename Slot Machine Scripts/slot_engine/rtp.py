@@ -0,0 +1,147 @@
+import math
+
+# Exact (analytic) RTP: every cell is an independent uniform draw over the machine's symbols
+def _win_terms(machine, symbol):
+    """Express "line wins with reference symbol" as a signed sum of "every cell is in the symbol's set" events."""
+    wild = machine.wild_index
+    if symbol == wild:
+        return ((wild, 1),)  # all wild
+    return ((symbol, 1), (wild, -1))  # all in {symbol, wild} but not all wild
+
+def _joint_all_in(machine, a, b, only_first, only_second, shared):
+    """P(first line's cells all in set(a) and second line's cells all in set(b)), with set(s) = {s, wild}."""
+    wild, count = machine.wild_index, machine.symbol_count
+    size_a = 1 if a == wild else 2
+    size_b = 1 if b == wild else 2
+    size_shared = 2 if a == b != wild else 1
+    return (size_a / count) ** only_first * (size_b / count) ** only_second * (size_shared / count) ** shared
+
+def line_win_probabilities(machine, length):
+    """Return, per symbol index, the exact probability that a line of `length` cells wins with that reference symbol."""
+    count = machine.symbol_count
+    all_wild = (1 / count) ** length
+    return [all_wild if symbol == machine.wild_index else (2 / count) ** length - all_wild
+            for symbol in range(count)]
+
+def _line_covariance(machine, first, second, bet, shared):
+    """Exact covariance of two lines' payouts given how many cells they share."""
+    _, positions_a, multipliers_a = first
+    _, positions_b, multipliers_b = second
+    only_a, only_b = len(positions_a) - shared, len(positions_b) - shared
+    joint = 0.0
+    for s in range(machine.symbol_count):
+        pay_s = math.floor(bet * multipliers_a[s])
+        if not pay_s:
+            continue
+        for t in range(machine.symbol_count):
+            pay_t = math.floor(bet * multipliers_b[t])
+            if not pay_t:
+                continue
+            probability = sum(sign_a * sign_b * _joint_all_in(machine, a, b, only_a, only_b, shared)
+                              for a, sign_a in _win_terms(machine, s) for b, sign_b in _win_terms(machine, t))
+            joint += pay_s * pay_t * probability
+    mean_a = sum(p * math.floor(bet * m) for p, m in zip(line_win_probabilities(machine, len(positions_a)), multipliers_a))
+    mean_b = sum(p * math.floor(bet * m) for p, m in zip(line_win_probabilities(machine, len(positions_b)), multipliers_b))
+    return joint - mean_a * mean_b
+
+def payline_overlaps(machine):
+    """Return {(i, j): shared cells} for every pair of paylines (0-based, i < j) that share at least one cell."""
+    overlaps = {}
+    for lines in machine.cell_lines:  # Only pairs that meet in some cell are ever visited
+        for k, i in enumerate(lines):
+            for j in lines[k + 1:]:
+                overlaps[(i, j)] = overlaps.get((i, j), 0) + 1
+    return overlaps
+
+def payline_overlap_stats(machine, overlaps=None):
+    """Summarize how the paylines overlap: lines per cell, overlapping pairs and cells shared per pair."""
+    overlaps = payline_overlaps(machine) if overlaps is None else overlaps
+    lines, cells = len(machine.compiled_paylines), machine.cell_lines
+    per_cell = [len(through) for through in cells]
+    busiest = max(range(len(cells)), key=per_cell.__getitem__)
+    return {
+        "lines": lines,
+        "cells": len(cells),
+        "uncovered_cells": per_cell.count(0),
+        "mean_lines_per_cell": sum(per_cell) / len(cells),
+        "max_lines_per_cell": per_cell[busiest],
+        "busiest_cell": divmod(busiest, machine.reels),
+        "pairs": lines * (lines - 1) // 2,
+        "overlapping_pairs": len(overlaps),
+        "max_shared_cells": max(overlaps.values(), default=0),
+        "mean_shared_cells": sum(overlaps.values()) / len(overlaps) if overlaps else 0.0,
+    }
+
+def compute_exact_rtp(machine, bet=1):
+    """Compute expected value, variance and per-line contributions of a paid spin from the paytable and paylines."""
+    lines = []
+    for number, (mask, positions, multipliers) in enumerate(machine.compiled_paylines, 1):
+        probabilities = line_win_probabilities(machine, len(positions))
+        payouts = [math.floor(bet * multiplier) for multiplier in multipliers]
+        lines.append({
+            "line": number,
+            "length": len(positions),
+            "hit_probability": sum(probabilities),
+            "expected_payout": sum(p * pay for p, pay in zip(probabilities, payouts)),
+            "symbol_probabilities": dict(zip(machine.symbols, probabilities)),
+            "variance_contribution": 0.0,
+        })
+    # Lines that share no cells are independent; only overlapping pairs (and each line with itself) add covariance.
+    # The overlapping pairs come straight from the cell index instead of testing every pair's masks.
+    compiled = machine.compiled_paylines
+    overlaps = payline_overlaps(machine)
+    pairs = dict(overlaps)
+    for i, (mask, _, _) in enumerate(compiled):
+        pairs[(i, i)] = bin(mask).count("1")
+    for (i, j), shared in sorted(pairs.items()):
+        covariance = _line_covariance(machine, compiled[i], compiled[j], bet, shared)
+        lines[i]["variance_contribution"] += covariance
+        if j != i:
+            lines[i]["variance_contribution"] += covariance
+            lines[j]["variance_contribution"] += covariance
+    expected_payout = sum(line["expected_payout"] for line in lines)
+    expected_credits = sum(line["hit_probability"] for line in lines) * 25.5  # randbelow(50) + 1 averages 25.5
+    bonus_probability = (1 / machine.symbol_count) ** len(machine.bonus_trigger)
+    # free_spins_mode pays each free spin's coins and extra credits into the balance
+    free_spins_ev = bonus_probability * machine.free_spins * (expected_payout + expected_credits)
+    # Steady state: a 1-in-1000 hit pays the base plus, on average, 1000 spins of accrued bets
+    jackpot_probability = 1 / 1000 if 1 <= bet <= 100 else 0
+    jackpot_ev = jackpot_probability * machine.jackpot_base + (bet * machine.jackpot_increment if jackpot_probability else 0)
+    return {
+        "bet": bet,
+        "lines": lines,
+        "expected_payout": expected_payout,
+        "variance": sum(line["variance_contribution"] for line in lines),
+        "expected_extra_credits": expected_credits,
+        "bonus_probability": bonus_probability,
+        "free_spins_ev": free_spins_ev,
+        "jackpot_ev": jackpot_ev,
+        "rtp": (expected_payout + free_spins_ev + jackpot_ev) / bet,
+        "overlap": payline_overlap_stats(machine, overlaps),
+    }
+
+def get_overlap_text(overlap):
+    """Return payline_overlap_stats as two report lines."""
+    row, reel = overlap["busiest_cell"]
+    return (f"Overlap: {overlap['overlapping_pairs']} of {overlap['pairs']} line pairs share cells "
+            f"(mean {overlap['mean_shared_cells']:.2f}, max {overlap['max_shared_cells']} shared)\n"
+            f"  Lines per cell: mean {overlap['mean_lines_per_cell']:.2f}, max {overlap['max_lines_per_cell']} "
+            f"(row {row + 1}, reel {reel + 1}), {overlap['uncovered_cells']} cell(s) on no line")
+
+def get_exact_rtp_report(machine, results):
+    """Return formatted exact RTP results with a per-line contribution table."""
+    bet = results["bet"]
+    text = (f"Variant: {machine.rows}x{machine.reels} ({len(machine.paylines)} paylines), bet {bet}\n"
+            f"RTP: {results['rtp'] * 100:.4f}%\n"
+            f"  Paylines: {results['expected_payout'] / bet * 100:.4f}% "
+            f"(payout per spin: mean {results['expected_payout']:.5f}, variance {results['variance']:.5f})\n"
+            f"  Free spins: {results['free_spins_ev'] / bet * 100:.6f}% (bonus probability {results['bonus_probability']:.4e})\n"
+            f"  Jackpot: {results['jackpot_ev'] / bet * 100:.4f}%\n"
+            f"Extra credits per spin: {results['expected_extra_credits']:.4f}\n"
+            f"{get_overlap_text(results['overlap'])}\n"
+            f"{'Line':>4} {'Len':>3} {'Hit prob':>11} {'Exp payout':>11} {'RTP share':>9} {'Var share':>9}\n")
+    for line in results["lines"]:
+        text += (f"{line['line']:>4} {line['length']:>3} {line['hit_probability']:>11.4e} {line['expected_payout']:>11.4e} "
+                 f"{line['expected_payout'] / results['expected_payout'] * 100:>8.2f}% "
+                 f"{line['variance_contribution'] / results['variance'] * 100:>8.2f}%\n")
+    return text.rstrip("\n")
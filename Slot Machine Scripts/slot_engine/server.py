@@ -0,0 +1,348 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from . import randomness
+from .console import Fore, Style
+from .state import GameState
+from .storage import LEADERBOARD_DB, LEADERBOARD_SIZE, SESSION_DB, LeaderboardStore, SessionStore
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SAVE_INTERVAL = 1.0  # Seconds between batched writes of changed sessions and new leaderboard scores
+MAX_REQUEST = 64 * 1024  # Longest request line accepted, in bytes
+MAX_NAME = 64
+
+class SharedJackpot:
+    """In-process progressive jackpot shared by every session on one server; same interface as storage.JackpotPool."""
+    def __init__(self, base):
+        self.base = base
+        self.value = base
+
+    def amount(self):
+        return self.value
+
+    def contribute(self, amount):
+        self.value += int(amount)
+        return self.value
+
+    def claim(self):
+        won, self.value = self.value, self.base
+        return won
+
+    def close(self):
+        pass
+
+class PoolClient:
+    """Awaitable view of the jackpot pool; with an executor, each pool call runs there instead of on the event loop."""
+    def __init__(self, pool, executor=None):
+        self.pool = pool
+        self.executor = executor
+
+    async def _call(self, function, *args):
+        if self.executor is None:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def amount(self):
+        return await self._call(self.pool.amount)
+
+    async def contribute(self, amount):
+        return await self._call(self.pool.contribute, amount)
+
+    async def claim(self):
+        return await self._call(self.pool.claim)
+
+class PlayerSession(GameState):
+    """One player's GameState with the GUI's rules (SlotMachineGUI.spin, finalize_spin, free spins and buy_item), minus the window.
+
+    The state's own jackpot field is unused: every session plays for the server's shared pool, through a PoolClient.
+    Requests await the pool only before they change the session or after they are done with it, so a batch save
+    between two awaits never catches a spin or purchase half-applied.
+    """
+    __slots__ = ("theme", "name", "pool", "scores")
+
+    def __init__(self, machine, theme, name, pool, scores, saved=None):
+        super().__init__(machine)
+        if saved is not None:
+            self.restore(saved)
+        self.theme = theme
+        self.name = name
+        self.pool = pool
+        self.scores = scores  # The server's queue of (name, score) leaderboard entries, written in batches
+
+    async def state(self, jackpot=None):
+        """Return what a client shows between spins: counters, the shared jackpot and the headline stats."""
+        if jackpot is None:
+            jackpot = await self.pool.amount()
+        return {"player": self.name, "balance": self.balance, "credits": self.credits, "extra_spins": self.extra_spins,
+                "jackpot": jackpot, "bet": self.bet, "charm_active": self.charm_active,
+                "spins": self.stats.spins, "wins": self.stats.wins, "total_won": self.stats.total_won,
+                "total_bet": self.stats.total_bet}
+
+    def _lines(self, win_lines):
+        return [{"line": line_num, "symbol": self.machine.symbol_names[symbol], "payout": line_payout, "cells": line}
+                for line_num, symbol, line_payout, line in win_lines]
+
+    def _clamp_bet(self):
+        if self.bet > self.balance:
+            self.bet = max(1, self.balance) if self.balance >= 1 else 0
+
+    def _game_over(self):
+        if self.balance <= 0 and self.extra_spins <= 0:
+            self.scores.append((self.name, self.balance))
+            return True
+        return False
+
+    async def spin(self, bet):
+        """Play one spin, and its free spins if it triggers the bonus; return the grids, wins and new state."""
+        if not isinstance(bet, int) or isinstance(bet, bool):
+            raise ValueError("Please enter a valid number!")
+        if bet < 1 or bet > 100:
+            raise ValueError("Bet must be between 1 and 100 coins!")
+        if bet > self.balance:
+            raise ValueError("Bet cannot exceed your balance!")
+        machine = self.machine
+        extra_spin = self.extra_spins > 0
+        jackpot = None if extra_spin else await self.pool.contribute(bet * machine.jackpot_increment)
+        reels = machine.spin_reels()
+        payout, win_lines, extra_credits = machine.check_paylines(reels, bet, 2 if self.charm_active else 1)
+        jackpot_payout = 0
+        if machine.jackpot_hit(bet):
+            jackpot_payout = await self.pool.claim()
+            jackpot = None
+        # The pool is settled: apply the whole spin without awaiting again
+        self.bet = bet
+        self.is_extra_spin = extra_spin
+        if extra_spin:
+            self.extra_spins -= 1
+        else:
+            self.balance -= bet
+        self.balance += payout + jackpot_payout
+        self.credits += extra_credits
+        bonus = machine.check_bonus(reels)
+        self.stats.record(0 if extra_spin else bet, payout + jackpot_payout, extra_credits, win_lines, bonus, jackpot_payout > 0)
+        if jackpot_payout and not win_lines:
+            self.scores.append((self.name, self.balance))
+        result = {"grid": reels, "payout": payout, "extra_credits": extra_credits, "jackpot_payout": jackpot_payout,
+                  "lines": self._lines(win_lines), "extra_spin": extra_spin, "bonus": bonus}
+        if bonus:
+            result["free_spins"] = self.free_spins()
+        self.charm_active = False
+        self._clamp_bet()
+        result["game_over"] = self._game_over()
+        result.update(await self.state(jackpot))
+        return result
+
+    def free_spins(self):
+        """Play the machine's free spins at the current bet and pay their coins and credits into the balance at the end."""
+        machine = self.machine
+        spins, winnings = [], 0
+        for _ in range(machine.free_spins):
+            reels = machine.spin_reels()
+            payout, win_lines, extra_credits = machine.check_paylines(reels, self.bet)
+            winnings += payout + extra_credits
+            self.credits += extra_credits
+            self.stats.record(0, payout + extra_credits, extra_credits, win_lines)
+            spins.append({"grid": reels, "payout": payout, "extra_credits": extra_credits, "lines": self._lines(win_lines)})
+        self.balance += winnings
+        self.scores.append((self.name, self.balance))
+        return spins
+
+    async def buy(self, item_name):
+        """Buy a store item with credits and apply it; return what it did and the new state."""
+        item = self.theme["store_items"].get(item_name) if isinstance(item_name, str) else None
+        if item is None:
+            raise ValueError(f"Unknown store item {item_name!r}")
+        if self.credits < item["cost"]:
+            raise ValueError("Insufficient credits to purchase this item!")
+        jackpot = await self.pool.contribute(500) if item_name == "Jackpot Boost" else None
+        self.credits -= item["cost"]
+        result = {"item": item_name}
+        if item_name == "Extra Spin":
+            self.extra_spins += 1
+            result["message"] = "Purchased Extra Spin!"
+        elif item_name == "Balance Boost":
+            self.balance += 100
+            result["message"] = "Purchased Balance Boost! +100 coins"
+        elif item_name == "Jackpot Boost":
+            result["message"] = "Purchased Jackpot Boost! +500 to jackpot"
+        elif item_name == "Free Spins Purchase":
+            result["free_spins"] = self.free_spins()
+            result["message"] = f"Purchased Free Spins! Enjoy {self.machine.free_spins} spins!"
+        elif item_name == "Mystery Prize":
+            prize_type = randomness.random_source.randbelow(3)
+            if prize_type == 0:
+                prize = randomness.random_source.randbelow(51) + 50  # 50-100 coins
+                self.balance += prize
+                result["message"] = f"Mystery Prize: {prize} coins!"
+            elif prize_type == 1:
+                prize = randomness.random_source.randbelow(51) + 50  # 50-100 credits
+                self.credits += prize
+                result["message"] = f"Mystery Prize: {prize} credits!"
+            else:
+                self.extra_spins += 1
+                result["message"] = "Mystery Prize: 1 extra spin!"
+        elif item_name == self.theme["charm_item"]:
+            self.charm_active = True
+            result["message"] = f"{item_name} active for next spin!"
+        self._clamp_bet()
+        result.update(await self.state(jackpot))
+        return result
+
+class GameServer:
+    """Asyncio JSON-lines server holding one PlayerSession per connection, a shared jackpot and batched saves.
+
+    Each request is one JSON object per line, e.g. {"op": "spin", "bet": 5}; each reply is one line with "ok" and either
+    the result or an "error". Ops: login (first, with "player"), spin, buy ("item"), balance, leaderboard ("k"), quit.
+    A request's "id" is echoed back. Sessions only share the jackpot pool; every SQLite call, including those of a
+    file-backed JackpotPool, runs on one database thread.
+    """
+    def __init__(self, machine, theme, pool=None, session_db=SESSION_DB, leaderboard_db=LEADERBOARD_DB, save_interval=SAVE_INTERVAL):
+        self.machine = machine
+        self.theme = theme
+        self.pool = pool or SharedJackpot(machine.jackpot_base)
+        self.save_interval = save_interval
+        self.store = SessionStore(session_db)
+        self.board = LeaderboardStore(leaderboard_db)
+        self.sessions = {}  # Connected players by name; None while a login is loading the saved state
+        self.dirty = {}  # Sessions changed since the last batch write, by name
+        self.scores = []  # Leaderboard entries waiting for the next batch write
+        self.requests = 0
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="server-db")  # Owns every SQLite connection
+        # A JackpotPool's queries block, so they go to the database thread; sessions and scores stay on the loop
+        self.pool_client = PoolClient(self.pool, None if isinstance(self.pool, SharedJackpot) else self._db)
+
+    async def _run_db(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._db, function, *args)
+
+    async def login(self, name):
+        """Open a session for `name`, loading the player's saved state; one connection per player at a time."""
+        if not isinstance(name, str) or not name.strip() or len(name) > MAX_NAME:
+            raise ValueError(f"player must be a non-empty name of at most {MAX_NAME} characters")
+        if name in self.sessions:
+            raise ValueError(f"{name} is already playing on another connection")
+        self.sessions[name] = None
+        try:
+            pending = self.dirty.get(name)  # Disconnected, but not written yet: the database copy is stale
+            saved = pending.to_bytes() if pending else await self._run_db(self.store.load, name)
+        except BaseException:
+            del self.sessions[name]
+            raise
+        session = self.sessions[name] = PlayerSession(self.machine, self.theme, name, self.pool_client, self.scores, saved)
+        return session
+
+    def logout(self, session):
+        """Close a session like the GUI's Quit: record the final balance on the leaderboard and queue a save."""
+        self.scores.append((session.name, session.balance))
+        self.dirty[session.name] = session
+        del self.sessions[session.name]
+
+    async def leaderboard(self, k):
+        if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= 100:
+            raise ValueError("k must be a number from 1 to 100")
+        return await self._run_db(self.board.top, k)
+
+    async def handle_request(self, request, session):
+        """Run one request and return (reply, session); raise ValueError for a bad request."""
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        op = request.get("op")
+        if op == "login":
+            if session is not None:
+                raise ValueError("already logged in")
+            session = await self.login(request.get("player"))
+            return await session.state(), session
+        if op == "leaderboard":
+            return {"leaderboard": await self.leaderboard(request.get("k", LEADERBOARD_SIZE))}, session
+        if session is None:
+            raise ValueError("log in first")
+        if op == "spin":
+            reply = await session.spin(request.get("bet", session.bet))
+        elif op == "buy":
+            reply = await session.buy(request.get("item"))
+        elif op == "balance":
+            return await session.state(), session
+        else:
+            raise ValueError(f"unknown op {op!r}")
+        self.dirty[session.name] = session
+        return reply, session
+
+    async def handle(self, reader, writer):
+        """Serve one connection until it sends quit or disconnects."""
+        session = None
+        try:
+            while line := await reader.readline():
+                request = {}
+                try:
+                    request = json.loads(line)
+                    if isinstance(request, dict) and request.get("op") == "quit":
+                        break
+                    reply, session = await self.handle_request(request, session)
+                    reply = dict(reply, ok=True)
+                except ValueError as e:  # Includes malformed JSON
+                    reply = {"ok": False, "error": str(e)}
+                if isinstance(request, dict) and "id" in request:
+                    reply["id"] = request["id"]
+                self.requests += 1
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):  # ValueError: a request line longer than MAX_REQUEST
+            pass
+        finally:
+            if session is not None:
+                self.logout(session)
+            writer.close()
+
+    def _write(self, states, scores):
+        try:
+            self.store.save_many(states)
+            self.board.add_many(scores)
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Failed to save sessions: {e}.{Style.RESET_ALL}")
+
+    async def flush(self):
+        """Write every changed session and queued leaderboard score in one batch on the database thread."""
+        if not self.dirty and not self.scores:
+            return
+        states = {name: session.to_bytes() for name, session in self.dirty.items()}
+        scores = self.scores[:]
+        self.dirty.clear()
+        self.scores.clear()  # Sessions hold this list, so empty it in place
+        await self._run_db(self._write, states, scores)
+
+    async def _save_loop(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.flush()
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT):
+        """Accept connections until cancelled, then close every session and write everything still pending."""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST, backlog=1024)
+        saver = asyncio.create_task(self._save_loop())
+        print(f"Serving {self.machine.rows}x{self.machine.reels} on {host}:{port} (Ctrl+C to stop)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            saver.cancel()
+            for session in [session for session in self.sessions.values() if session is not None]:
+                self.logout(session)
+            await self.flush()
+            await self._run_db(self.close_databases)
+            self._db.shutdown()
+
+    def close_databases(self):
+        self.store.close()
+        self.board.close()
+        self.pool.close()
+
+def run_server(machine, theme, host=SERVER_HOST, port=SERVER_PORT, pool=None):
+    """Run a GameServer for `machine` until Ctrl+C."""
+    server = GameServer(machine, theme, pool)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+    print(f"Server stopped after {server.requests} requests.")
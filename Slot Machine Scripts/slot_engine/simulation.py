@@ -0,0 +1,186 @@
+import hashlib
+import math
+import os
+import time
+import zlib
+
+from .machine import load_numpy, _require_numpy
+from .randomness import SecretsRandom, BufferedCryptoRandom, SeededRandom, set_random_source
+from .stats import SpinStats, get_spin_stats_report
+
+
+def benchmark_rng(machine, spins=20000):
+    """Measure spins per second (spin_reels + check_paylines) with the unbuffered and buffered sources."""
+    results = {}
+    for name, source in (("secrets (unbuffered)", SecretsRandom()), ("buffered", BufferedCryptoRandom())):
+        previous = set_random_source(source)
+        try:
+            start = time.perf_counter()
+            for _ in range(spins):
+                machine.check_paylines(machine.spin_reels(), 1)
+            results[name] = spins / (time.perf_counter() - start)
+        finally:
+            set_random_source(previous)
+    return results
+
+# Deterministic headless sessions
+def play_session(machine, spins, bet=1, seed=0, ledger=None):
+    """Play paid spins from a seed with the game's rules, writing one ledger row per spin; return a summary."""
+    previous = set_random_source(SeededRandom(seed))
+    balance, jackpot, credits = 100, machine.jackpot_base, 0
+    digest = hashlib.sha256()
+    try:
+        for spin in range(1, spins + 1):
+            balance -= bet
+            jackpot += bet * machine.jackpot_increment
+            reels = machine.spin_reels()
+            payout, win_lines, extra_credits = machine.check_paylines(reels, bet)
+            jackpot_payout = machine.check_jackpot(bet, jackpot)
+            balance += payout + jackpot_payout
+            credits += extra_credits
+            if jackpot_payout:
+                jackpot = machine.jackpot_base
+            bonus = machine.check_bonus(reels)
+            if bonus:
+                for _ in range(machine.free_spins):
+                    free_payout, _, free_credits = machine.check_paylines(machine.spin_reels(), bet)
+                    balance += free_payout + free_credits
+                    credits += free_credits
+            grid = zlib.crc32("".join(map("".join, reels)).encode())
+            row = (f"{spin},{grid:08x},{bet},{payout},{extra_credits},{jackpot_payout},{int(bonus)},"
+                   f"{'+'.join(str(line_num) for line_num, _, _, _ in win_lines)},{balance},{credits},{jackpot}\n")
+            digest.update(row.encode())
+            if ledger is not None:
+                ledger.write(row)
+    finally:
+        set_random_source(previous)
+    return {"spins": spins, "balance": balance, "credits": credits, "jackpot": jackpot, "digest": digest.hexdigest()}
+
+# Headless Monte Carlo simulator
+SIMULATION_FIELDS = ("spins", "total_bet", "total_won", "line_won", "jackpot_won", "free_spins_won",
+                     "extra_credits", "hits", "jackpots", "bonuses", "sum_sq")
+
+def _new_simulation_stats(machine):
+    stats = dict.fromkeys(SIMULATION_FIELDS, 0)
+    stats["stream"] = SpinStats(machine)  # Distribution, hit counters and intervals, one paid spin (with its feature) per record
+    return stats
+
+def _simulate_scalar(machine, spins, bet):
+    """Play paid spins one at a time through spin_reels/check_paylines/check_bonus/check_jackpot."""
+    stats = _new_simulation_stats(machine)
+    jackpot = machine.jackpot_base
+    for _ in range(spins):
+        jackpot += bet * machine.jackpot_increment
+        reels = machine.spin_reels()
+        payout, win_lines, extra_credits = machine.check_paylines(reels, bet)
+        jackpot_payout = machine.check_jackpot(bet, jackpot)
+        free_won = 0
+        bonus = machine.check_bonus(reels)
+        if bonus:
+            stats["bonuses"] += 1
+            for _ in range(machine.free_spins):
+                free_payout, _, free_credits = machine.check_paylines(machine.spin_reels(), bet)
+                free_won += free_payout + free_credits  # free_spins_mode pays credits into the balance too
+        if jackpot_payout:
+            stats["jackpots"] += 1
+            jackpot = machine.jackpot_base
+        if win_lines or jackpot_payout:
+            stats["hits"] += 1
+        won = payout + jackpot_payout + free_won
+        stats["line_won"] += payout
+        stats["jackpot_won"] += jackpot_payout
+        stats["free_spins_won"] += free_won
+        stats["extra_credits"] += extra_credits
+        stats["total_won"] += won
+        stats["sum_sq"] += won * won
+        stats["stream"].record(bet, won, extra_credits, win_lines, bonus, jackpot_payout > 0)
+    stats["spins"] = spins
+    stats["total_bet"] = spins * bet
+    return stats
+
+def _simulate_batch(machine, spins, bet, seed, chunk):
+    """Play paid spins in chunks through the NumPy batch engine with its own seeded stream."""
+    np = _require_numpy()
+    stats = _new_simulation_stats(machine)
+    rng = np.random.default_rng(seed)
+    jackpot = machine.jackpot_base
+    remaining = spins
+    while remaining > 0:
+        n = min(chunk, remaining)
+        remaining -= n
+        grids = machine.spin_reels_batch(n, rng)
+        payouts, win_masks, extra_credits, line_symbols = machine.check_paylines_batch(grids, bet, rng=rng, with_symbols=True)
+        bonus = machine.check_bonus_batch(grids)
+        free_won = np.zeros(n, dtype=np.int64)
+        bonus_count = int(bonus.sum())
+        if bonus_count:
+            free_payouts, _, free_credits = machine.check_paylines_batch(
+                machine.spin_reels_batch(bonus_count * machine.free_spins, rng), bet, rng=rng)
+            free_won[bonus] = (free_payouts + free_credits).reshape(bonus_count, machine.free_spins).sum(axis=1)
+        # The jackpot is progressive, so walk the (rare) hits in order and accrue bets between them
+        jackpot_won = np.zeros(n, dtype=np.int64)
+        accrued_to = 0
+        if 1 <= bet <= 100:
+            for k in np.flatnonzero(rng.integers(0, 1000, size=n) == 0):
+                jackpot += bet * machine.jackpot_increment * (k + 1 - accrued_to)
+                jackpot_won[k] = jackpot
+                jackpot = machine.jackpot_base
+                accrued_to = k + 1
+        jackpot += bet * machine.jackpot_increment * (n - accrued_to)
+        won = payouts + jackpot_won + free_won
+        stats["line_won"] += int(payouts.sum())
+        stats["jackpot_won"] += int(jackpot_won.sum())
+        stats["free_spins_won"] += int(free_won.sum())
+        stats["extra_credits"] += int(extra_credits.sum())
+        stats["total_won"] += int(won.sum())
+        stats["sum_sq"] += int((won * won).sum())
+        stats["hits"] += int((win_masks.any(axis=1) | (jackpot_won > 0)).sum())
+        stats["jackpots"] += int((jackpot_won > 0).sum())
+        stats["bonuses"] += bonus_count
+        stats["stream"].record_batch(bet, won, extra_credits, win_masks, line_symbols, bonus, jackpot_won > 0)
+    stats["spins"] = spins
+    stats["total_bet"] = spins * bet
+    return stats
+
+def simulate_spins(machine, spins, bet=1, seed=None, chunk=50000):
+    """Play `spins` paid spins with no Tk root and return summable statistics."""
+    if load_numpy() is None:  # The scalar simulator runs without NumPy
+        return _simulate_scalar(machine, spins, bet)
+    return _simulate_batch(machine, spins, bet, seed, chunk)
+
+def run_simulation(machine, spins, bet=1, workers=None, seed=None, tasks_per_worker=4):
+    """Fan a simulation across a process pool, one independent RNG stream per task, and merge the results."""
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    tasks = max(1, min(spins, workers * tasks_per_worker))
+    shares = [spins // tasks + (1 if i < spins % tasks else 0) for i in range(tasks)]
+    np = load_numpy()
+    seeds = np.random.SeedSequence(seed).spawn(tasks) if np is not None else [None] * tasks
+    totals = _new_simulation_stats(machine)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for stats in pool.map(simulate_spins, [machine] * tasks, shares, [bet] * tasks, seeds):
+            for field in SIMULATION_FIELDS:
+                totals[field] += stats[field]
+            totals["stream"].merge(stats["stream"])
+    return totals
+
+def get_simulation_report(machine, stats, bet=1):
+    """Return formatted simulation results with a 95% confidence interval on RTP."""
+    spins = stats["spins"]
+    total_bet = stats["total_bet"]
+    mean = stats["total_won"] / spins
+    variance = max(stats["sum_sq"] / spins - mean * mean, 0)
+    margin = 1.96 * math.sqrt(variance / spins) / bet * 100
+    jackpot_rate = f"1 in {spins / stats['jackpots']:.0f}" if stats["jackpots"] else "none observed"
+    bonus_rate = f"1 in {spins / stats['bonuses']:.0f}" if stats["bonuses"] else "none observed"
+    return (f"Variant: {machine.rows}x{machine.reels} ({len(machine.paylines)} paylines), bet {bet}\n"
+            f"Spins: {spins}\n"
+            f"RTP: {stats['total_won'] / total_bet * 100:.3f}% ± {margin:.3f}% (95% CI)\n"
+            f"  Paylines: {stats['line_won'] / total_bet * 100:.3f}%\n"
+            f"  Free spins: {stats['free_spins_won'] / total_bet * 100:.3f}%\n"
+            f"  Jackpot: {stats['jackpot_won'] / total_bet * 100:.3f}%\n"
+            f"Hit frequency: {stats['hits'] / spins * 100:.3f}%\n"
+            f"Jackpot frequency: {jackpot_rate}\n"
+            f"Bonus frequency: {bonus_rate}\n"
+            f"Extra credits per spin: {stats['extra_credits'] / spins:.3f}"
+            + (f"\n{get_spin_stats_report(machine, stats['stream'])}" if "stream" in stats else ""))
@@ -0,0 +1,77 @@
+import struct
+
+from .stats import SpinStats
+
+STATE_VERSION = 1
+STATE_MAGIC = b"SLGS"
+# Magic, version, flags, then the fixed-width integer fields: balance, jackpot, credits (int64), extra spins (uint32), bet (uint8)
+_STATE_HEADER = struct.Struct("<4sBBqqqIB")
+_CHARM_ACTIVE = 1
+_EXTRA_SPIN = 2
+
+class GameState:
+    """One player's game: coins, jackpot, credits, extra spins, bet, store charm and stats, saved as JSON or compact bytes."""
+    __slots__ = ("machine", "balance", "jackpot", "extra_spins", "credits", "bet", "charm_active", "is_extra_spin", "stats")
+
+    def __init__(self, machine, balance=100, jackpot=None, extra_spins=0, credits=0, bet=None, stats=None):
+        self.machine = machine
+        self.balance = balance
+        self.jackpot = machine.jackpot_base if jackpot is None else jackpot
+        self.extra_spins = extra_spins
+        self.credits = credits
+        self.bet = min(1, balance) if bet is None else bet
+        self.charm_active = False  # The store's charm item doubles the next spin's extra credits
+        self.is_extra_spin = False  # The spin in progress was paid with an extra spin
+        self.stats = stats if stats is not None else SpinStats(machine)
+
+    def to_dict(self):
+        """Return a JSON-ready dict; the original save file keys are kept, so older versions can still read it."""
+        return {"version": STATE_VERSION, "balance": self.balance, "jackpot": self.jackpot, "stats": self.stats.to_dict(),
+                "extra_spins": self.extra_spins, "credits": self.credits, "bet": self.bet,
+                "charm_active": self.charm_active, "is_extra_spin": self.is_extra_spin}
+
+    @classmethod
+    def from_dict(cls, machine, data):
+        """Rebuild a state from to_dict output or an older save file that only has the original keys."""
+        if int(data.get("version", 0)) > STATE_VERSION:
+            raise ValueError(f"Save file version {data['version']} is newer than this game supports ({STATE_VERSION})")
+        balance = int(data.get("balance", 100))
+        state = cls(machine, balance, int(data.get("jackpot", machine.jackpot_base)), int(data.get("extra_spins", 0)),
+                    int(data.get("credits", 0)), min(int(data.get("bet", 1)), balance) if balance >= 1 else 0,
+                    SpinStats.from_dict(machine, data.get("stats")))
+        state.charm_active = bool(data.get("charm_active", False))
+        state.is_extra_spin = bool(data.get("is_extra_spin", False))
+        return state
+
+    def to_bytes(self):
+        """Return the state as versioned little-endian bytes; raise ValueError if a field overflows its fixed width."""
+        flags = (_CHARM_ACTIVE if self.charm_active else 0) | (_EXTRA_SPIN if self.is_extra_spin else 0)
+        try:
+            header = _STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, flags, self.balance, self.jackpot, self.credits,
+                                        self.extra_spins, self.bet)
+        except struct.error as e:
+            raise ValueError(f"Game state does not fit its fixed-width fields: {e}")
+        return header + self.stats.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, machine, data):
+        """Rebuild a state from to_bytes output; raise ValueError for foreign, newer or truncated data."""
+        try:
+            magic, version, flags, balance, jackpot, credits, extra_spins, bet = _STATE_HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError(f"Truncated game state: {e}")
+        if magic != STATE_MAGIC:
+            raise ValueError("Not a saved game state")
+        if version > STATE_VERSION:
+            raise ValueError(f"Game state version {version} is newer than this game supports ({STATE_VERSION})")
+        state = cls(machine, balance, jackpot, extra_spins, credits, bet,
+                    SpinStats.from_bytes(machine, data, _STATE_HEADER.size))
+        state.charm_active = bool(flags & _CHARM_ACTIVE)
+        state.is_extra_spin = bool(flags & _EXTRA_SPIN)
+        return state
+
+    def restore(self, data):
+        """Roll this state back, in place, to a to_bytes checkpoint."""
+        saved = GameState.from_bytes(self.machine, data)
+        for field in GameState.__slots__:
+            setattr(self, field, getattr(saved, field))
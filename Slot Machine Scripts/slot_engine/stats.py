@@ -0,0 +1,375 @@
+import math
+import struct
+import sys
+from array import array
+
+from .machine import _require_numpy  # record_batch needs NumPy; per-spin recording does not
+
+# Payout histogram: bucket 0 holds spins that paid nothing, bucket k holds payouts in [2**(k-1), 2**k)
+HISTOGRAM_BUCKETS = 32
+SKETCH_ACCURACY = 0.01  # Relative error of quantile estimates
+STATS_FORMAT = 1
+# Binary form: format, count width, the five totals, Welford moments, sketch accuracy, then the lengths of the histogram,
+# symbol hits, line hits and sketch buckets. An array of every count follows (4 bytes each unless one needs 8), then the
+# sketch's bucket keys as int32.
+_STATS_HEADER = struct.Struct("<BB5q3d3HI")
+
+def histogram_bucket_label(bucket):
+    """Return the coin range a histogram bucket covers, e.g. '8-15'."""
+    if bucket == 0:
+        return "0"
+    low, high = 1 << (bucket - 1), (1 << bucket) - 1
+    return f"{low}+" if bucket == HISTOGRAM_BUCKETS - 1 else (str(low) if low == high else f"{low}-{high}")
+
+class QuantileSketch:
+    """Relative-error quantile sketch: counts per log-spaced bucket, so memory grows with the value range, not the count."""
+    __slots__ = ("accuracy", "gamma", "_log_gamma", "zeros", "count", "buckets")
+
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.count = 0
+        self.buckets = {}
+
+    def add(self, value, count=1):
+        if value <= 0:
+            self.zeros += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+
+    def add_many(self, values):
+        """Add a NumPy array of values in one pass."""
+        np = _require_numpy()
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        self.count += len(values)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        self.count += other.count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q):
+        """Return the approximate q-quantile (0 <= q <= 1), or None when nothing was added."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0
+        seen = self.zeros
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)  # Midpoint of the bucket in relative terms
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {"accuracy": self.accuracy, "zeros": self.zeros, "buckets": sorted(self.buckets.items())}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data.get("accuracy", SKETCH_ACCURACY))
+        sketch.zeros = int(data.get("zeros", 0))
+        sketch.buckets = {int(key): int(count) for key, count in data.get("buckets", [])}
+        sketch.count = sketch.zeros + sum(sketch.buckets.values())
+        return sketch
+
+class EventInterval:
+    """Track the gaps between events (spins that did not have the event) without storing them."""
+    __slots__ = ("events", "since", "leading", "gap_total", "longest")
+
+    def __init__(self):
+        self.events = 0
+        self.since = 0  # Spins since the last event
+        self.leading = 0  # Spins before the first event, so independent streams can be merged end to end
+        self.gap_total = 0
+        self.longest = 0
+
+    def record(self, hit):
+        if not hit:
+            self.since += 1
+            return
+        if not self.events:
+            self.leading = self.since
+        self.events += 1
+        self.gap_total += self.since
+        self.longest = max(self.longest, self.since)
+        self.since = 0
+
+    def record_batch(self, flags):
+        """Record a NumPy bool array of per-spin flags, in order."""
+        np = _require_numpy()
+        hits = np.flatnonzero(flags)
+        if not len(hits):
+            self.since += len(flags)
+            return
+        first = self.since + int(hits[0])
+        gaps = np.diff(hits) - 1
+        if not self.events:
+            self.leading = first
+        self.events += len(hits)
+        self.gap_total += first + int(gaps.sum())
+        self.longest = max(self.longest, first, int(gaps.max()) if len(gaps) else 0)
+        self.since = len(flags) - 1 - int(hits[-1])
+
+    def merge(self, other):
+        """Append another stream's events after this one's."""
+        if not other.events:
+            self.since += other.since
+            return
+        first = self.since + other.leading
+        if not self.events:
+            self.leading = first
+        self.events += other.events
+        self.gap_total += first + other.gap_total - other.leading
+        self.longest = max(self.longest, other.longest, first)
+        self.since = other.since
+
+    def longest_run(self):
+        """Return the longest run of spins without the event, including the current one."""
+        return max(self.longest, self.since)
+
+    def mean_interval(self):
+        """Return the mean number of spins per event, or None before the first event."""
+        return (self.gap_total + self.events) / self.events if self.events else None
+
+    def to_dict(self):
+        return {"events": self.events, "since": self.since, "leading": self.leading, "gap_total": self.gap_total, "longest": self.longest}
+
+    @classmethod
+    def from_dict(cls, data):
+        interval = cls()
+        for key in ("events", "since", "leading", "gap_total", "longest"):
+            setattr(interval, key, int(data.get(key, 0)))
+        return interval
+
+class SpinStats:
+    """Streaming per-spin statistics in O(1) memory, updated one spin at a time or one NumPy batch at a time."""
+    __slots__ = ("symbols", "symbol_index", "spins", "wins", "total_bet", "total_won", "total_credits", "mean", "m2",
+                 "histogram", "symbol_hits", "line_hits", "win_gaps", "bonus_gaps", "jackpot_gaps", "sketch")
+
+    def __init__(self, machine):
+        self.symbols = machine.symbols
+        self.symbol_index = machine.symbol_index
+        self.spins = 0
+        self.wins = 0
+        self.total_bet = 0
+        self.total_won = 0  # Coins only
+        self.total_credits = 0
+        self.mean = 0.0  # Welford running mean and sum of squared deviations of coins won, over the sketch's spins
+        self.m2 = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.symbol_hits = [0] * machine.symbol_count
+        self.line_hits = [0] * len(machine.paylines)
+        self.win_gaps = EventInterval()  # Gaps between wins are the losing streaks
+        self.bonus_gaps = EventInterval()
+        self.jackpot_gaps = EventInterval()
+        self.sketch = QuantileSketch()
+
+    def record(self, bet, won, credits=0, win_lines=(), bonus=False, jackpot=False):
+        """Record one spin: coins bet (0 for extra and free spins), coins and credits won, and check_paylines' win lines."""
+        self.spins += 1
+        self.total_bet += bet
+        self.total_won += won
+        self.total_credits += credits
+        delta = won - self.mean
+        self.mean += delta / (self.sketch.count + 1)  # A save from before these stats counts fewer spins than self.spins
+        self.m2 += delta * (won - self.mean)
+        self.histogram[min(int(won).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        for line_num, symbol, _, _ in win_lines:
+            self.line_hits[line_num - 1] += 1
+            self.symbol_hits[self.symbol_index[symbol]] += 1
+        win = bool(win_lines) or bool(jackpot)
+        self.wins += win
+        self.win_gaps.record(win)
+        self.bonus_gaps.record(bonus)
+        self.jackpot_gaps.record(jackpot)
+        self.sketch.add(won)
+
+    def record_batch(self, bet, won, credits, win_masks, line_symbols=None, bonus=None, jackpot=None):
+        """Record N spins from the batch engine: per-spin coin and credit arrays, (N, lines) win masks and their symbols."""
+        n = len(won)
+        if not n:
+            return
+        np = _require_numpy()
+        won = np.asarray(won, dtype=np.int64)
+        wins = win_masks.any(axis=1) if jackpot is None else win_masks.any(axis=1) | jackpot
+        self.spins += n
+        self.total_bet += int(np.sum(np.broadcast_to(bet, won.shape), dtype=np.int64))
+        self.total_won += int(won.sum())
+        self.total_credits += int(np.sum(credits, dtype=np.int64))
+        # Chan et al.'s parallel update merges the batch's moments into the running ones
+        batch_mean = float(won.mean())
+        batch_m2 = float(((won - batch_mean) ** 2).sum())
+        total = self.sketch.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * (total - n) * n / total
+        buckets = np.minimum(np.frexp(won.astype(np.float64))[1], HISTOGRAM_BUCKETS - 1)
+        for bucket, count in enumerate(np.bincount(buckets, minlength=HISTOGRAM_BUCKETS).tolist()):
+            self.histogram[bucket] += count
+        for i, hits in enumerate(win_masks.sum(axis=0).tolist()):
+            self.line_hits[i] += hits
+        if line_symbols is not None:
+            for i, hits in enumerate(np.bincount(line_symbols[win_masks], minlength=len(self.symbol_hits)).tolist()):
+                self.symbol_hits[i] += hits
+        self.wins += int(wins.sum())
+        self.win_gaps.record_batch(wins)
+        self.bonus_gaps.record_batch(bonus if bonus is not None else np.zeros(n, dtype=bool))
+        self.jackpot_gaps.record_batch(jackpot if jackpot is not None else np.zeros(n, dtype=bool))
+        self.sketch.add_many(won)
+
+    def merge(self, other):
+        """Fold in another SpinStats for the same machine, as if its spins followed this one's."""
+        seen, other_seen = self.sketch.count, other.sketch.count
+        if other_seen:
+            delta = other.mean - self.mean
+            self.mean += delta * other_seen / (seen + other_seen)
+            self.m2 += other.m2 + delta * delta * seen * other_seen / (seen + other_seen)
+        for field in ("spins", "wins", "total_bet", "total_won", "total_credits"):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        for field in ("histogram", "symbol_hits", "line_hits"):
+            setattr(self, field, [a + b for a, b in zip(getattr(self, field), getattr(other, field))])
+        self.win_gaps.merge(other.win_gaps)
+        self.bonus_gaps.merge(other.bonus_gaps)
+        self.jackpot_gaps.merge(other.jackpot_gaps)
+        self.sketch.merge(other.sketch)
+
+    def variance(self):
+        return self.m2 / (self.sketch.count - 1) if self.sketch.count > 1 else 0.0
+
+    def percentile(self, p):
+        """Return the approximate p-th percentile of coins won per spin."""
+        return self.sketch.quantile(p / 100)
+
+    def longest_losing_streak(self):
+        return self.win_gaps.longest_run()
+
+    def top(self, hits, count=3):
+        """Return the indices of the `count` largest counters, most hits first, skipping zeros."""
+        return [i for i in sorted(range(len(hits)), key=lambda i: -hits[i])[:count] if hits[i]]
+
+    def to_dict(self):
+        """Return a JSON-ready dict; the original spins/wins/total_won/total_bet keys stay at the top level."""
+        return {"spins": self.spins, "wins": self.wins, "total_won": self.total_won, "total_bet": self.total_bet,
+                "format": STATS_FORMAT, "total_credits": self.total_credits, "mean": self.mean, "m2": self.m2,
+                "histogram": list(self.histogram), "symbol_hits": list(self.symbol_hits), "line_hits": list(self.line_hits),
+                "win_gaps": self.win_gaps.to_dict(), "bonus_gaps": self.bonus_gaps.to_dict(),
+                "jackpot_gaps": self.jackpot_gaps.to_dict(), "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, machine, data):
+        """Rebuild stats from to_dict output; saves that only hold the original four counters start the rest fresh."""
+        stats = cls(machine)
+        data = data or {}
+        stats.spins = int(data.get("spins", 0))
+        stats.wins = int(data.get("wins", 0))
+        stats.total_won = int(data.get("total_won", 0))
+        stats.total_bet = int(data.get("total_bet", 0))
+        if data.get("format") != STATS_FORMAT:
+            return stats
+        stats.total_credits = int(data.get("total_credits", 0))
+        stats.mean, stats.m2 = float(data.get("mean", 0.0)), float(data.get("m2", 0.0))
+        for field in ("histogram", "symbol_hits", "line_hits"):
+            saved = data.get(field, [])
+            if len(saved) == len(getattr(stats, field)):  # Counters from another grid size or machine are dropped
+                setattr(stats, field, [int(count) for count in saved])
+        for field in ("win_gaps", "bonus_gaps", "jackpot_gaps"):
+            setattr(stats, field, EventInterval.from_dict(data.get(field, {})))
+        stats.sketch = QuantileSketch.from_dict(data.get("sketch", {}))
+        return stats
+
+    def to_bytes(self):
+        """Return the stats in a compact little-endian binary form, about half the size of the JSON."""
+        sketch = self.sketch
+        keys = sorted(sketch.buckets)
+        counts = self.histogram + self.symbol_hits + self.line_hits
+        for interval in (self.win_gaps, self.bonus_gaps, self.jackpot_gaps):
+            counts += [interval.events, interval.since, interval.leading, interval.gap_total, interval.longest]
+        counts.append(sketch.zeros)
+        counts += [sketch.buckets[key] for key in keys]
+        try:
+            counts = array("I", counts)
+        except OverflowError:  # A count past 2**32 - 1
+            counts = array("Q", counts)
+        keys = array("i", keys)
+        if sys.byteorder == "big":
+            counts.byteswap()
+            keys.byteswap()
+        return b"".join((_STATS_HEADER.pack(STATS_FORMAT, counts.itemsize, self.spins, self.wins, self.total_bet,
+                                            self.total_won, self.total_credits, self.mean, self.m2, sketch.accuracy,
+                                            len(self.histogram), len(self.symbol_hits), len(self.line_hits), len(keys)),
+                         counts.tobytes(), keys.tobytes()))
+
+    @classmethod
+    def from_bytes(cls, machine, data, offset=0):
+        """Rebuild stats from to_bytes output at `offset`; raise ValueError for another format or truncated data."""
+        try:
+            (version, width, spins, wins, total_bet, total_won, total_credits, mean, m2, accuracy,
+             histogram, symbol_hits, line_hits, buckets) = _STATS_HEADER.unpack_from(data, offset)
+        except struct.error as e:
+            raise ValueError(f"Truncated stats: {e}")
+        if version != STATS_FORMAT or width not in (4, 8):
+            raise ValueError(f"Unsupported stats format {version}")
+        offset += _STATS_HEADER.size
+        counts, keys = array("I" if width == 4 else "Q"), array("i")
+        end = offset + width * (histogram + symbol_hits + line_hits + 16 + buckets)
+        if len(data) < end + 4 * buckets:
+            raise ValueError("Truncated stats")
+        counts.frombytes(data[offset:end])
+        keys.frombytes(data[end:end + 4 * buckets])
+        if sys.byteorder == "big":
+            counts.byteswap()
+            keys.byteswap()
+        counts = counts.tolist()
+        stats = cls(machine)
+        stats.spins, stats.wins, stats.total_bet, stats.total_won, stats.total_credits = spins, wins, total_bet, total_won, total_credits
+        stats.mean, stats.m2 = mean, m2
+        start = 0
+        for field, size in (("histogram", histogram), ("symbol_hits", symbol_hits), ("line_hits", line_hits)):
+            if size == len(getattr(stats, field)):  # Counters from another grid size or machine are dropped
+                setattr(stats, field, counts[start:start + size])
+            start += size
+        for field in ("win_gaps", "bonus_gaps", "jackpot_gaps"):
+            interval = getattr(stats, field)
+            interval.events, interval.since, interval.leading, interval.gap_total, interval.longest = counts[start:start + 5]
+            start += 5
+        sketch = stats.sketch = QuantileSketch(accuracy)
+        sketch.zeros = counts[start]
+        sketch.buckets = dict(zip(keys.tolist(), counts[start + 1:]))
+        sketch.count = sketch.zeros + sum(counts[start + 1:])
+        return stats
+
+def _interval_text(interval):
+    mean = interval.mean_interval()
+    return f"1 in {mean:,.0f} spins (longest gap {interval.longest_run():,})" if mean else "none observed"
+
+def get_spin_stats_report(machine, stats):
+    """Return the streaming statistics as text: moments, percentiles, streaks, intervals, top lines/symbols and the histogram."""
+    if not stats.spins:
+        return "No spins recorded yet."
+    line_wins = sum(stats.line_hits) or 1
+    symbol_wins = sum(stats.symbol_hits) or 1
+    percentiles = ", ".join(f"p{p:g} {stats.percentile(p):.0f}" for p in (50, 90, 99, 99.9))
+    lines = ", ".join(f"{i + 1} ({stats.line_hits[i] / line_wins * 100:.1f}%)" for i in stats.top(stats.line_hits))
+    symbols = ", ".join(f"{machine.symbol_names[stats.symbols[i]]} ({stats.symbol_hits[i] / symbol_wins * 100:.1f}%)"
+                        for i in stats.top(stats.symbol_hits))
+    shown = [bucket for bucket, count in enumerate(stats.histogram) if count]
+    histogram = "\n".join(f"  {histogram_bucket_label(bucket):>11}: {stats.histogram[bucket] / stats.sketch.count * 100:8.4f}%"
+                          for bucket in shown) if stats.sketch.count else "  (none)"
+    return (f"Coins per spin: mean {stats.mean:.3f}, std dev {math.sqrt(stats.variance()):.3f}\n"
+            f"Percentiles (coins): {percentiles}\n"
+            f"Longest losing streak: {stats.longest_losing_streak():,} spins\n"
+            f"Bonus: {_interval_text(stats.bonus_gaps)}\n"
+            f"Jackpot: {_interval_text(stats.jackpot_gaps)}\n"
+            f"Top paylines: {lines or 'none'}\n"
+            f"Top symbols: {symbols or 'none'}\n"
+            f"Payout histogram (coins per spin):\n{histogram}")
@@ -0,0 +1,391 @@
+import collections
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from .console import Fore, Style
+from .machine import JACKPOT_BASE
+from .state import GameState
+
+SAVE_FILE = "slot_machine_save.json"
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file beside `path`, fsync it and rename it over `path` so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    while True:
+        tmp_path = os.path.join(directory, f".{os.urandom(6).hex()}.tmp")
+        try:
+            # Unlike mkstemp's 0600, 0666 lets the kernel apply the umask, as open() does for a new file
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)  # Keep the permissions of the file being replaced
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):  # Make the rename itself durable; Windows cannot open a directory
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:  # Some filesystems refuse to fsync a directory; the file itself is already in place
+            pass
+
+def load_game(machine):
+    """Load the player's GameState from the save file, or start a new one."""
+    try:
+        if os.path.exists(SAVE_FILE):
+            with open(SAVE_FILE, "r") as f:
+                return GameState.from_dict(machine, json.load(f))
+    except (ValueError, IOError) as e:  # ValueError includes JSONDecodeError
+        print(f"{Fore.RED}Failed to load save file: {e}. Starting new game.{Style.RESET_ALL}")
+        try:
+            os.replace(SAVE_FILE, SAVE_FILE + ".corrupt")  # Keep the damaged save instead of overwriting it
+        except OSError:
+            pass
+    return GameState(machine)
+
+def save_game(state):
+    """Save a GameState to the save file atomically."""
+    try:
+        write_json_atomic(SAVE_FILE, state.to_dict())
+    except (IOError, OSError) as e:
+        print(f"{Fore.RED}Failed to save game: {e}.{Style.RESET_ALL}")
+
+def reset_game(machine):
+    """Delete JSON files and return a new GameState."""
+    try:
+        for file in [SAVE_FILE, "leaderboard.json"]:
+            if os.path.exists(file):
+                os.remove(file)
+        leaderboard.clear()
+    except (OSError, sqlite3.Error) as e:
+        print(f"{Fore.RED}Failed to reset game: {e}.{Style.RESET_ALL}")
+    return GameState(machine)
+
+LEADERBOARD_DB = "leaderboard.db"
+LEADERBOARD_SIZE = 5
+
+class LeaderboardStore:
+    """SQLite leaderboard keeping every score and each player's best, with indexed top-K reads cached until the next write."""
+    def __init__(self, path=LEADERBOARD_DB, top_k=LEADERBOARD_SIZE):
+        self.path = path
+        self.top_k = top_k
+        self._conn = None
+        self._cache = {}
+        self._data_version = None
+
+    def _connect(self):
+        if self._conn is None:
+            is_new = not os.path.exists(self.path)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS scores (id INTEGER PRIMARY KEY, name TEXT NOT NULL, score INTEGER NOT NULL, created REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+                CREATE TABLE IF NOT EXISTS best (name TEXT PRIMARY KEY, score INTEGER NOT NULL);
+                CREATE INDEX IF NOT EXISTS best_by_score ON best (score DESC);
+            """)
+            if is_new:
+                self._import_json("leaderboard.json")
+        return self._conn
+
+    def _import_json(self, path):
+        """Carry entries over from the old leaderboard.json the first time the database is created."""
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        if not isinstance(entries, list):
+            return
+        for entry in entries:  # Skip hand-edited or partly written entries rather than fail to open the leaderboard
+            if (isinstance(entry, dict) and isinstance(entry.get("name"), str)
+                    and isinstance(entry.get("score"), int) and not isinstance(entry.get("score"), bool)):
+                self.add(entry["name"], entry["score"])
+
+    def _check_cache(self):
+        # data_version changes whenever another connection (e.g. another machine process) commits
+        version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._cache.clear()
+            self._data_version = version
+
+    def add(self, name, score):
+        """Record a score and update the player's best."""
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT INTO scores (name, score, created) VALUES (?, ?, ?)", (name, int(score), time.time()))
+            conn.execute("INSERT INTO best (name, score) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET score = max(score, excluded.score)", (name, int(score)))
+        self._cache.clear()
+
+    def add_many(self, entries):
+        """Record [(name, score)] in one transaction."""
+        if not entries:
+            return
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany("INSERT INTO scores (name, score, created) VALUES (?, ?, ?)",
+                             [(name, int(score), now) for name, score in entries])
+            conn.executemany("INSERT INTO best (name, score) VALUES (?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET score = max(score, excluded.score)",
+                             [(name, int(score)) for name, score in entries])
+        self._cache.clear()
+
+    def top(self, k=None):
+        """Return the k highest scores (default top_k) as [{"name", "score"}], ties in the order they were set."""
+        k = k or self.top_k
+        self._check_cache()
+        key = ("top", k)
+        if key not in self._cache:
+            rows = self._connect().execute("SELECT name, score FROM scores ORDER BY score DESC, id LIMIT ?", (k,))
+            self._cache[key] = [{"name": name, "score": score} for name, score in rows]
+        return self._cache[key]
+
+    def top_players(self, k=None):
+        """Return the k best players by personal best, one entry per player."""
+        k = k or self.top_k
+        self._check_cache()
+        key = ("players", k)
+        if key not in self._cache:
+            rows = self._connect().execute("SELECT name, score FROM best ORDER BY score DESC, name LIMIT ?", (k,))
+            self._cache[key] = [{"name": name, "score": score} for name, score in rows]
+        return self._cache[key]
+
+    def player_best(self, name):
+        """Return the player's best score, or None if they have none."""
+        row = self._connect().execute("SELECT score FROM best WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def clear(self):
+        """Delete every score."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM scores")
+            conn.execute("DELETE FROM best")
+        self._cache.clear()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._cache.clear()
+
+leaderboard = LeaderboardStore()
+
+def load_leaderboard():
+    """Load the top leaderboard entries."""
+    try:
+        return leaderboard.top()
+    except sqlite3.Error:
+        return []
+
+def save_leaderboard(score, name):
+    """Save high score to leaderboard."""
+    try:
+        leaderboard.add(name, score)
+    except sqlite3.Error as e:
+        print(f"{Fore.RED}Failed to save leaderboard: {e}.{Style.RESET_ALL}")
+
+JACKPOT_POOL_DB = "jackpot_pool.db"
+
+class JackpotPool:
+    """Progressive jackpot shared by every machine process pointing at the same SQLite file."""
+    def __init__(self, path=JACKPOT_POOL_DB, name="progressive", base=JACKPOT_BASE):
+        self.path = path
+        self.name = name
+        self.base = base
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            # Autocommit mode; claims open their own IMMEDIATE transaction. WAL lets readers run alongside the writer.
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS pool (name TEXT PRIMARY KEY, amount INTEGER NOT NULL)")
+            self._conn.execute("INSERT OR IGNORE INTO pool (name, amount) VALUES (?, ?)", (self.name, self.base))
+        return self._conn
+
+    def amount(self):
+        """Return the current pool value."""
+        return self._connect().execute("SELECT amount FROM pool WHERE name = ?", (self.name,)).fetchone()[0]
+
+    def contribute(self, amount):
+        """Atomically add to the pool and return the new value."""
+        return self._connect().execute("UPDATE pool SET amount = amount + ? WHERE name = ? RETURNING amount",
+                                       (int(amount), self.name)).fetchone()[0]
+
+    def claim(self):
+        """Atomically take the whole pool, reset it to the base value and return what was won."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            won = conn.execute("SELECT amount FROM pool WHERE name = ?", (self.name,)).fetchone()[0]
+            conn.execute("UPDATE pool SET amount = ? WHERE name = ?", (self.base, self.name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return won
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+SESSION_DB = "slot_sessions.db"
+
+class SessionStore:
+    """SQLite store of per-player game state for the game server, one GameState.to_bytes row per player, written in batches."""
+    def __init__(self, path=SESSION_DB):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS sessions (name TEXT PRIMARY KEY, data BLOB NOT NULL, updated REAL NOT NULL)")
+        return self._conn
+
+    def load(self, name):
+        """Return the player's saved state bytes, or None for a new player."""
+        row = self._connect().execute("SELECT data FROM sessions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, states):
+        """Write {name: state bytes} in one transaction."""
+        if not states:
+            return
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany("INSERT INTO sessions (name, data, updated) VALUES (?, ?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                             [(name, state, now) for name, state in states.items()])
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def _hammer_jackpot_pool(path, spins, seed, claim_odds):
+    """One simulated player: contribute every spin and claim with 1-in-claim_odds chance."""
+    pool = JackpotPool(path)
+    rng = random.Random(seed)
+    contributed = claimed = claims = 0
+    latencies = []
+    for _ in range(spins):
+        start = time.perf_counter()
+        pool.contribute(1)
+        contributed += 1
+        if rng.randrange(claim_odds) == 0:
+            claimed += pool.claim()
+            claims += 1
+        latencies.append(time.perf_counter() - start)
+    pool.close()
+    return contributed, claimed, claims, latencies
+
+def benchmark_jackpot_pool(players=16, spins=2000, claim_odds=100, path=None):
+    """Hammer one pool from many processes, check that no coin was lost or duplicated, and return throughput figures."""
+    from concurrent.futures import ProcessPoolExecutor
+    directory = tempfile.mkdtemp() if path is None else None
+    path = path or os.path.join(directory, JACKPOT_POOL_DB)
+    pool = JackpotPool(path)
+    initial = pool.amount()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=players) as executor:
+        results = list(executor.map(_hammer_jackpot_pool, [path] * players, [spins] * players,
+                                    range(players), [claim_odds] * players))
+    elapsed = time.perf_counter() - start
+    contributed = sum(result[0] for result in results)
+    claimed = sum(result[1] for result in results)
+    claims = sum(result[2] for result in results)
+    latencies = sorted(latency for result in results for latency in result[3])
+    final = pool.amount()
+    pool.close()
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "players": players,
+        "spins": players * spins,
+        "claims": claims,
+        "spins_per_second": players * spins / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        # Every coin paid in is either still in the pool or was claimed; each claim re-seeds the base
+        "consistent": initial + contributed + claims * pool.base == final + claimed,
+    }
+
+class SaveWorker:
+    """Coalesce save requests and write only the newest snapshot, atomically, on a background thread."""
+    def __init__(self, delay=0.5, timed=False):
+        self.delay = delay
+        self.timed = timed  # Time each write into save_times, for the GUI thread to collect
+        self.save_times = collections.deque()  # Seconds per write; deque appends and pops are thread-safe
+        self._pending = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="save-worker", daemon=True)
+        self._thread.start()
+
+    def request(self, state):
+        """Queue a snapshot of the GameState; the compact bytes form is cheap to take and later changes cannot leak into it."""
+        snapshot = (state.machine, state.to_bytes())
+        with self._cond:
+            if not self._closed:
+                self._pending = snapshot
+                self._cond.notify()
+                return
+        save_game(GameState.from_bytes(*snapshot))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                # Debounce: let changes arriving within `delay` collapse into this write
+                deadline = time.monotonic() + self.delay
+                while not self._closed and (remaining := deadline - time.monotonic()) > 0:
+                    self._cond.wait(remaining)
+                snapshot, self._pending = self._pending, None
+                closed = self._closed
+            if snapshot is not None:
+                timed = self.timed
+                if timed:
+                    start = time.perf_counter()
+                save_game(GameState.from_bytes(*snapshot))  # Decoding and JSON encoding happen here, off the GUI thread
+                if timed:
+                    self.save_times.append(time.perf_counter() - start)
+            if closed:
+                return
+
+    def close(self):
+        """Write any pending snapshot immediately and stop the thread; later requests save synchronously."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()